@@ -6,6 +6,7 @@ from pathlib import Path
 EXPERIMENTS_DIR = Path("experiments")
 SUMMARY_DIR = EXPERIMENTS_DIR / "summary"
 MODEL_PROJECT_SUMMARY_DIR = SUMMARY_DIR / "model_project"
+MODEL_PROJECT_SUMMARY_SHARD_FILE = MODEL_PROJECT_SUMMARY_DIR / "all_model_project_summary.jsonl"
 ANALYSIS_OUTPUT_DIR = SUMMARY_DIR / "analysis"
 
 # Projects
@@ -121,27 +122,45 @@ def get_project_level(project_name):
     print(f"알 수 없는 프로젝트 레벨: {project_name}, 'unknown'으로 처리합니다.")
     return "unknown"
 
+def load_model_project_summaries():
+    """모델별 프로젝트 요약을 (모델 이름, 데이터) 목록으로 불러옵니다.
+
+    summarize_results.py --model-project-output jsonl 로 생성된 샤드 파일이 있으면 이를 사용하고,
+    없으면 모델별 {model_name}.json 파일들을 읽습니다.
+    """
+    if MODEL_PROJECT_SUMMARY_SHARD_FILE.exists():
+        summaries = []
+        with open(MODEL_PROJECT_SUMMARY_SHARD_FILE, 'r') as f:
+            for line_num, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError as e:
+                    print(f"Error loading JSON from {MODEL_PROJECT_SUMMARY_SHARD_FILE} (line {line_num}): {e}")
+                    continue
+                summaries.append((record["model"], record["projects"]))
+        return summaries
+
+    return [(model_file.stem, load_json(model_file)) for model_file in MODEL_PROJECT_SUMMARY_DIR.glob("*.json")]
+
 def analyze_model_results():
     """모델별 프로젝트 결과를 분석하고 정리합니다."""
     # 출력 디렉토리 생성
     ANALYSIS_OUTPUT_DIR.mkdir(exist_ok=True, parents=True)
     
     # 모델 JSON 파일들 로드
-    model_files = list(MODEL_PROJECT_SUMMARY_DIR.glob("*.json"))
-    if not model_files:
+    model_summaries = load_model_project_summaries()
+    if not model_summaries:
         print(f"모델 프로젝트 요약 파일을 찾을 수 없습니다: {MODEL_PROJECT_SUMMARY_DIR}")
         return
     
     # 모델별 분석 결과 저장
     models_analysis = {}
     
-    for model_file in model_files:
-        model_name = model_file.stem
+    for model_name, model_data in model_summaries:
         print(f"분석 중: {model_name}")
         
-        # 모델 데이터 로드
-        model_data = load_json(model_file)
-        
         # 모델 분석 결과 초기화
         model_analysis = {
             "model": model_name,
@@ -1,6 +1,10 @@
 import os
+import io
 import json
 import sys
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext, redirect_stdout, redirect_stderr
 from pathlib import Path
 
 # --- Constants ---
@@ -13,12 +17,26 @@ SUMMARY_DIR = EXPERIMENTS_DIR / SUMMARY_DIR_NAME
 MODEL_PROJECT_SUMMARY_DIR = SUMMARY_DIR / MODEL_PROJECT_SUMMARY_SUBDIR
 ALL_PROJECT_SUMMARY_FILE = SUMMARY_DIR / "all_project_summary.json"
 ALL_MODEL_SUMMARY_FILE = SUMMARY_DIR / "all_model_summary.json"
+# 모든 모델의 프로젝트 요약을 한 줄에 한 모델씩 담는 NDJSON 샤드 (--model-project-output jsonl)
+MODEL_PROJECT_SUMMARY_SHARD_FILE = MODEL_PROJECT_SUMMARY_DIR / "all_model_project_summary.jsonl"
 
 # 자기 개선 관련 상수 추가
 MAX_ITERATIONS = 5  # 최대 반복 횟수 기준값
 
+# ITERATION_DETAILS 저장 범위 (--details 옵션)
+DETAILS_ALL = "all"          # 실패한 결과까지 모두 저장
+DETAILS_SUCCESS = "success"  # 최종 성공한 결과만 저장 (기본값)
+DETAILS_NONE = "none"        # 상세 정보를 저장하지 않음
+DETAILS_CHOICES = [DETAILS_ALL, DETAILS_SUCCESS, DETAILS_NONE]
+
+# 모델별 프로젝트 요약 저장 형식 (--model-project-output 옵션)
+MODEL_PROJECT_OUTPUT_FILES = "files"  # 모델마다 {model_name}.json 파일 저장 (기본값)
+MODEL_PROJECT_OUTPUT_JSONL = "jsonl"  # 단일 샤드 파일에 모델별로 한 줄씩 스트리밍 저장
+MODEL_PROJECT_OUTPUT_CHOICES = [MODEL_PROJECT_OUTPUT_FILES, MODEL_PROJECT_OUTPUT_JSONL]
+
 LOGICAL = "logical"
 PHYSICAL = "physical"
+MODES = (LOGICAL, PHYSICAL)
 CODE = "code"
 HARDWARE = "hardware"
 CODEWARE = "codeware"
@@ -44,6 +62,16 @@ ITERATION_SCORES_IF_NOT_INCORRECT_ATTRS = "iteration_scores_if_not_incorrect_att
 ITERATION_SCORES_IF_NOT_ENDPOINT_CONFLICTS_INCORRECT_ATTRS = "iteration_scores_if_not_endpoint_conflicts_incorrect_attrs"
 ITERATION_SCORES_IF_NOT_DIRECT_CONNECTIONS_INCORRECT_ATTRS = "iteration_scores_if_not_direct_connections_incorrect_attrs"
 ITERATION_SCORES_IF_NOT_ENDPOINT_CONFLICTS_DIRECT_CONNECTIONS_INCORRECT_ATTRS = "iteration_scores_if_not_endpoint_conflicts_direct_connections_incorrect_attrs"
+# physical 모드의 조건부 반복별 점수 키 (아래 순서대로 언패킹하여 사용)
+COND_ITERATION_SCORE_KEYS = (
+    ITERATION_SCORES_IF_NOT_ENDPOINT_CONFLICTS,
+    ITERATION_SCORES_IF_NOT_DIRECT_CONNECTIONS,
+    ITERATION_SCORES_IF_NOT_ENDPOINT_CONFLICTS_DIRECT_CONNECTIONS,
+    ITERATION_SCORES_IF_NOT_INCORRECT_ATTRS,
+    ITERATION_SCORES_IF_NOT_ENDPOINT_CONFLICTS_INCORRECT_ATTRS,
+    ITERATION_SCORES_IF_NOT_DIRECT_CONNECTIONS_INCORRECT_ATTRS,
+    ITERATION_SCORES_IF_NOT_ENDPOINT_CONFLICTS_DIRECT_CONNECTIONS_INCORRECT_ATTRS,
+)
 
 # Summary Keys
 SUCCESS = "success"
@@ -97,16 +125,33 @@ SUCCESS_IF_NOT_DIRECT_CONNECTIONS_INCORRECT_ATTRS = "success_if_not_direct_conne
 SCORE_IF_NOT_DIRECT_CONNECTIONS_INCORRECT_ATTRS = "score_if_not_direct_connections_incorrect_attrs"
 SUCCESS_IF_NOT_ENDPOINT_CONFLICTS_DIRECT_CONNECTIONS_INCORRECT_ATTRS = "success_if_not_endpoint_conflicts_direct_connections_incorrect_attrs"
 SCORE_IF_NOT_ENDPOINT_CONFLICTS_DIRECT_CONNECTIONS_INCORRECT_ATTRS = "score_if_not_endpoint_conflicts_direct_connections_incorrect_attrs"
+# 조건부 성공 횟수 키 -> 조건부 성공 비율 키 (physical 모드)
+CONDITIONAL_SUCCESS_SCORE_KEYS = (
+    (SUCCESS_IF_NOT_ENDPOINT_CONFLICTS, SCORE_IF_NOT_ENDPOINT_CONFLICTS),
+    (SUCCESS_IF_NOT_DIRECT_CONNECTIONS, SCORE_IF_NOT_DIRECT_CONNECTIONS),
+    (SUCCESS_IF_NOT_ENDPOINT_CONFLICTS_DIRECT_CONNECTIONS, SCORE_IF_NOT_ENDPOINT_CONFLICTS_DIRECT_CONNECTIONS),
+    (SUCCESS_IF_NOT_INCORRECT_ATTRS, SCORE_IF_NOT_INCORRECT_ATTRS),
+    (SUCCESS_IF_NOT_ENDPOINT_CONFLICTS_INCORRECT_ATTRS, SCORE_IF_NOT_ENDPOINT_CONFLICTS_INCORRECT_ATTRS),
+    (SUCCESS_IF_NOT_DIRECT_CONNECTIONS_INCORRECT_ATTRS, SCORE_IF_NOT_DIRECT_CONNECTIONS_INCORRECT_ATTRS),
+    (SUCCESS_IF_NOT_ENDPOINT_CONFLICTS_DIRECT_CONNECTIONS_INCORRECT_ATTRS, SCORE_IF_NOT_ENDPOINT_CONFLICTS_DIRECT_CONNECTIONS_INCORRECT_ATTRS),
+)
+
+# CodeBLEU 평균 계산용 (합계 키, 개수 키, 평균 키)
+CODEBLEU_AVERAGES = (
+    (CODEBLEU_SCORE_SUM, CODEBLEU_SCORE_COUNT, CODEBLEU_SCORE),
+    (CODEBLEU_SCORE_SUCCESS_SUM, CODEBLEU_SCORE_SUCCESS_COUNT, CODEBLEU_SCORE_SUCCESS),
+    (CODEBLEU_SCORE_FAIL_SUM, CODEBLEU_SCORE_FAIL_COUNT, CODEBLEU_SCORE_FAIL),
+)
 
 # Metrics to average (not recalculate percentage)
-HW_COUNT_METRICS_TO_AVERAGE = [
+HW_COUNT_METRICS_TO_AVERAGE = (
     DUPLICATE_CONNECTIONS,
     UNUSED_COMPONENTS,
     ENDPOINT_CONFLICTS,
     UNNECESSARY_COMPONENTS,
     MISSING_COMPONENTS,
     INCORRECT_ATTRS,  # 평균을 계산할 메트릭에 추가
-]
+)
 
 
 # --- Helper Functions ---
@@ -396,6 +441,14 @@ def calculate_scores(metrics_dict):
             calculate_scores(value)
 
 
+def calculate_codebleu_averages(mode_dict):
+    """Calculates CodeBLEU averages (overall/success/fail) from summed scores and counts."""
+    get = mode_dict.get
+    for sum_key, count_key, avg_key in CODEBLEU_AVERAGES:
+        if count := get(count_key):  # 개수가 없거나 0이면 기본값(0.0)을 그대로 둠
+            mode_dict[avg_key] = get(sum_key, 0.0) / count
+
+
 def calculate_average_hardware_metrics(hw_eval_dict, success_count):
     """Calculates averages for count-based hardware metrics."""
     if success_count > 0:
@@ -418,7 +471,26 @@ def recalculate_physical_hw_percentages(physical_hw_eval):
         physical_hw_eval[BREADBOARD_CONNECTION_PERCENTAGE] = 0
 
 
-def process_code_result(data, mode, project_summary):
+def calculate_conditional_scores(phys_summary):
+    """Calculates the conditional success ratios (score_if_not_*) of a physical summary."""
+    total = phys_summary[TOTAL]
+    if total > 0:
+        phys_summary.update(
+            (score_key, phys_summary[success_key] / total)
+            for success_key, score_key in CONDITIONAL_SUCCESS_SCORE_KEYS
+        )
+
+
+def should_store_details(final_success, details_mode):
+    """Returns True if iteration details should be built for this result."""
+    if details_mode == DETAILS_ALL:
+        return True
+    if details_mode == DETAILS_SUCCESS:
+        return bool(final_success)
+    return False
+
+
+def process_code_result(data, mode, project_summary, details_mode=DETAILS_SUCCESS):
     """Processes code results (logical/physical) from experiment data."""
     result_key = f"{mode}_{CODE}"
     if result_key in data:
@@ -461,46 +533,44 @@ def process_code_result(data, mode, project_summary):
                         project_summary[CODE][SUCCESS_WITH_IMPROVEMENT] += 1
                         project_summary[CODE][mode][SUCCESS_WITH_IMPROVEMENT] += 1
                 
-                # 각 반복 횟수별 점수 업데이트
+                # 각 반복 횟수별 점수 업데이트 (루프 밖에서 점수 딕셔너리를 미리 바인딩)
+                section_scores = project_summary[CODE][ITERATION_SCORES]
+                mode_scores = project_summary[CODE][mode][ITERATION_SCORES]
                 for iter_data in iterations_data:
                     iter_num = iter_data.get("iteration", 0) + 1  # 0-기반 인덱스를 1-기반으로 변환
+                    iter_key = str(iter_num)
                     iter_success = iter_data.get("success", False)
                     
-                    # 성공한 iteration 및 그 이전 iteration만 점수 업데이트
-                    if str(iter_num) in project_summary[CODE][ITERATION_SCORES] and (iter_success or iter_num <= iterations_to_success):
-                        # iteration이 성공했으면 1점, 아니면 0점
-                        if iter_success:
-                            project_summary[CODE][ITERATION_SCORES][str(iter_num)] += 1
-                            project_summary[CODE][mode][ITERATION_SCORES][str(iter_num)] += 1
+                    # 성공한 iteration만 1점 (실패한 iteration은 0점이므로 갱신할 필요 없음)
+                    if iter_success and iter_key in section_scores:
+                        section_scores[iter_key] += 1
+                        mode_scores[iter_key] += 1
                 
-                # 상세 정보 저장
-                project_key = f"{model_name}_{project_name}"
-                if project_key not in project_summary[CODE][ITERATION_DETAILS]:
-                    project_summary[CODE][ITERATION_DETAILS][project_key] = {}
-                if project_key not in project_summary[CODE][mode][ITERATION_DETAILS]:
-                    project_summary[CODE][mode][ITERATION_DETAILS][project_key] = {}
-                
-                # 상세 정보에 각 iteration 결과 저장
-                project_summary[CODE][ITERATION_DETAILS][project_key] = {
-                    "project": project_name,
-                    "model": model_name,
-                    "mode": mode,
-                    "final_success": final_success,
-                    "best_iteration": best_iteration,
-                    "iterations": [
-                        {
-                            "iteration": i.get("iteration", -1) + 1,  # 1-기반 인덱스로 변환
-                            "success": i.get("success", False),
-                            "compile_result": i.get("compile_result", False),
-                            "test_result": i.get("test_result", False),
-                            "codebleu_score": i.get("codebleu_score", None),
-                            "error": i.get("error", None)
-                        } for i in iterations_data
-                    ]
-                }
-                
-                # 모드별 상세 정보도 동일하게 저장
-                project_summary[CODE][mode][ITERATION_DETAILS][project_key] = project_summary[CODE][ITERATION_DETAILS][project_key]
+        # 상세 정보 저장 (--details 옵션에 따라 생략)
+        if has_iterations and should_store_details(final_success, details_mode):
+            project_key = f"{model_name}_{project_name}"
+            
+            # 상세 정보에 각 iteration 결과 저장
+            project_summary[CODE][ITERATION_DETAILS][project_key] = {
+                "project": project_name,
+                "model": model_name,
+                "mode": mode,
+                "final_success": final_success,
+                "best_iteration": best_iteration,
+                "iterations": [
+                    {
+                        "iteration": i.get("iteration", -1) + 1,  # 1-기반 인덱스로 변환
+                        "success": i.get("success", False),
+                        "compile_result": i.get("compile_result", False),
+                        "test_result": i.get("test_result", False),
+                        "codebleu_score": i.get("codebleu_score", None),
+                        "error": i.get("error", None)
+                    } for i in iterations_data
+                ]
+            }
+            
+            # 모드별 상세 정보도 동일하게 저장
+            project_summary[CODE][mode][ITERATION_DETAILS][project_key] = project_summary[CODE][ITERATION_DETAILS][project_key]
         
         if code_data.get(COMPILE_RESULT):
             project_summary[CODE][COMPILE_SUCCESS] += 1
@@ -526,7 +596,7 @@ def process_code_result(data, mode, project_summary):
         return False # Indicate result was missing
 
 
-def process_hardware_result(data, mode, project_summary):
+def process_hardware_result(data, mode, project_summary, details_mode=DETAILS_SUCCESS):
     """Processes hardware results (logical/physical) from experiment data."""
     result_key = f"{mode}_{HARDWARE}"
     if result_key in data:
@@ -569,95 +639,88 @@ def process_hardware_result(data, mode, project_summary):
                         project_summary[HARDWARE][SUCCESS_WITH_IMPROVEMENT] += 1
                         project_summary[HARDWARE][mode][SUCCESS_WITH_IMPROVEMENT] += 1
                 
-                # 각 반복 횟수별 점수 업데이트
+                # 각 반복 횟수별 점수 업데이트 (루프 밖에서 점수 딕셔너리를 미리 바인딩)
+                section_scores = project_summary[HARDWARE][ITERATION_SCORES]
+                mode_scores = project_summary[HARDWARE][mode][ITERATION_SCORES]
+                if mode == PHYSICAL:
+                    (ep_scores, dc_scores, ep_dc_scores, ia_scores,
+                     ep_ia_scores, dc_ia_scores, ep_dc_ia_scores) = [
+                        project_summary[HARDWARE][mode][key] for key in COND_ITERATION_SCORE_KEYS
+                    ]
                 for iter_data in iterations_data:
                     iter_num = iter_data.get("iteration", 0) + 1  # 0-기반 인덱스를 1-기반으로 변환
+                    iter_key = str(iter_num)
                     iter_success = iter_data.get("success", False)
                     
-                    # 성공한 iteration 및 그 이전 iteration만 점수 업데이트
-                    if str(iter_num) in project_summary[HARDWARE][ITERATION_SCORES] and (iter_success or iter_num <= iterations_to_success):
-                        # iteration이 성공했으면 1점, 아니면 0점
-                        if iter_success:
-                            project_summary[HARDWARE][ITERATION_SCORES][str(iter_num)] += 1
-                            project_summary[HARDWARE][mode][ITERATION_SCORES][str(iter_num)] += 1
+                    # 성공한 iteration만 1점 (실패한 iteration은 0점이므로 갱신할 필요 없음)
+                    if iter_success and iter_key in section_scores:
+                        section_scores[iter_key] += 1
+                        mode_scores[iter_key] += 1
                     
-                    # physical 모드에서 조건부 성공 점수 업데이트
-                    if mode == PHYSICAL and iter_data.get("evaluation_results_hw") and iter_data["evaluation_results_hw"].get("metrics"):
+                    # physical 모드에서 조건부 성공 점수 업데이트 (성공한 iteration만 해당)
+                    # 조건부 점수 딕셔너리는 mode_scores와 같은 키를 가지므로 키 검사는 한 번만 수행
+                    if mode == PHYSICAL and iter_success and iter_key in mode_scores and iter_data.get("evaluation_results_hw") and iter_data["evaluation_results_hw"].get("metrics"):
                         metrics = iter_data["evaluation_results_hw"]["metrics"]
                         
                         # 조건부 성공 여부 계산
                         # endpoint_conflicts와 direct_connections의 조건부 성공 업데이트
                         endpoint_conflicts_count = metrics.get("endpoint_conflicts", {}).get("endpoint_conflicts", 1)
                         direct_connections_count = metrics.get("direct_connections", {}).get("direct_connections", 1)
-                        is_successful = iter_success
+                        no_ep = endpoint_conflicts_count == 0
+                        no_dc = direct_connections_count == 0
                         
                         # 조건부 성공 점수 업데이트
-                        if str(iter_num) in project_summary[HARDWARE][mode][ITERATION_SCORES_IF_NOT_ENDPOINT_CONFLICTS]:
-                            if is_successful and endpoint_conflicts_count == 0:
-                                project_summary[HARDWARE][mode][ITERATION_SCORES_IF_NOT_ENDPOINT_CONFLICTS][str(iter_num)] += 1
-                                
-                        if str(iter_num) in project_summary[HARDWARE][mode][ITERATION_SCORES_IF_NOT_DIRECT_CONNECTIONS]:
-                            if is_successful and direct_connections_count == 0:
-                                project_summary[HARDWARE][mode][ITERATION_SCORES_IF_NOT_DIRECT_CONNECTIONS][str(iter_num)] += 1
-                                
-                        if str(iter_num) in project_summary[HARDWARE][mode][ITERATION_SCORES_IF_NOT_ENDPOINT_CONFLICTS_DIRECT_CONNECTIONS]:
-                            if is_successful and endpoint_conflicts_count == 0 and direct_connections_count == 0:
-                                project_summary[HARDWARE][mode][ITERATION_SCORES_IF_NOT_ENDPOINT_CONFLICTS_DIRECT_CONNECTIONS][str(iter_num)] += 1
+                        if no_ep:
+                            ep_scores[iter_key] += 1
+                        if no_dc:
+                            dc_scores[iter_key] += 1
+                        if no_ep and no_dc:
+                            ep_dc_scores[iter_key] += 1
                                 
                         # 컴포넌트 속성 관련 조건부 성공 점수 업데이트
                         if "component_attrs" in metrics:
                             incorrect_attrs_count = metrics["component_attrs"].get("incorrect_attrs", 1)
                             
-                            if str(iter_num) in project_summary[HARDWARE][mode][ITERATION_SCORES_IF_NOT_INCORRECT_ATTRS]:
-                                if is_successful and incorrect_attrs_count == 0:
-                                    project_summary[HARDWARE][mode][ITERATION_SCORES_IF_NOT_INCORRECT_ATTRS][str(iter_num)] += 1
-                                    
-                            if str(iter_num) in project_summary[HARDWARE][mode][ITERATION_SCORES_IF_NOT_ENDPOINT_CONFLICTS_INCORRECT_ATTRS]:
-                                if is_successful and endpoint_conflicts_count == 0 and incorrect_attrs_count == 0:
-                                    project_summary[HARDWARE][mode][ITERATION_SCORES_IF_NOT_ENDPOINT_CONFLICTS_INCORRECT_ATTRS][str(iter_num)] += 1
-                                    
-                            if str(iter_num) in project_summary[HARDWARE][mode][ITERATION_SCORES_IF_NOT_DIRECT_CONNECTIONS_INCORRECT_ATTRS]:
-                                if is_successful and direct_connections_count == 0 and incorrect_attrs_count == 0:
-                                    project_summary[HARDWARE][mode][ITERATION_SCORES_IF_NOT_DIRECT_CONNECTIONS_INCORRECT_ATTRS][str(iter_num)] += 1
-                                    
-                            if str(iter_num) in project_summary[HARDWARE][mode][ITERATION_SCORES_IF_NOT_ENDPOINT_CONFLICTS_DIRECT_CONNECTIONS_INCORRECT_ATTRS]:
-                                if is_successful and endpoint_conflicts_count == 0 and direct_connections_count == 0 and incorrect_attrs_count == 0:
-                                    project_summary[HARDWARE][mode][ITERATION_SCORES_IF_NOT_ENDPOINT_CONFLICTS_DIRECT_CONNECTIONS_INCORRECT_ATTRS][str(iter_num)] += 1
-                
-                # 상세 정보 저장
-                project_key = f"{model_name}_{project_name}"
-                if project_key not in project_summary[HARDWARE][ITERATION_DETAILS]:
-                    project_summary[HARDWARE][ITERATION_DETAILS][project_key] = {}
-                if project_key not in project_summary[HARDWARE][mode][ITERATION_DETAILS]:
-                    project_summary[HARDWARE][mode][ITERATION_DETAILS][project_key] = {}
+                            if incorrect_attrs_count == 0:
+                                ia_scores[iter_key] += 1
+                                if no_ep:
+                                    ep_ia_scores[iter_key] += 1
+                                if no_dc:
+                                    dc_ia_scores[iter_key] += 1
+                                if no_ep and no_dc:
+                                    ep_dc_ia_scores[iter_key] += 1
                 
-                # 상세 정보에 각 iteration 결과 저장
-                hw_eval_data = {}
-                for iter_data in iterations_data:
-                    if "evaluation" in iter_data and iter_data["evaluation"] and "metrics" in iter_data["evaluation"]:
-                        hw_eval_data = iter_data["evaluation"]["metrics"]
-                        break
-                
-                project_summary[HARDWARE][ITERATION_DETAILS][project_key] = {
-                    "project": project_name,
-                    "model": model_name,
-                    "mode": mode,
-                    "final_success": final_success,
-                    "best_iteration": best_iteration,
-                    "iterations": [
-                        {
-                            "iteration": i.get("iteration", -1) + 1,  # 1-기반 인덱스로 변환
-                            "success": i.get("success", False),
-                            "converting": i.get("converting", False),
-                            "error": i.get("error", None),
-                            "hardware_evaluation": i.get("evaluation", {}).get("metrics", {}) if i.get("evaluation") else {}
-                        } for i in iterations_data
-                    ],
-                    "hardware_evaluation": hw_eval_data
-                }
-                
-                # 모드별 상세 정보도 동일하게 저장
-                project_summary[HARDWARE][mode][ITERATION_DETAILS][project_key] = project_summary[HARDWARE][ITERATION_DETAILS][project_key]
+        # 상세 정보 저장 (--details 옵션에 따라 생략)
+        if has_iterations and should_store_details(final_success, details_mode):
+            project_key = f"{model_name}_{project_name}"
+            
+            # 상세 정보에 각 iteration 결과 저장
+            hw_eval_data = {}
+            for iter_data in iterations_data:
+                if "evaluation" in iter_data and iter_data["evaluation"] and "metrics" in iter_data["evaluation"]:
+                    hw_eval_data = iter_data["evaluation"]["metrics"]
+                    break
+            
+            project_summary[HARDWARE][ITERATION_DETAILS][project_key] = {
+                "project": project_name,
+                "model": model_name,
+                "mode": mode,
+                "final_success": final_success,
+                "best_iteration": best_iteration,
+                "iterations": [
+                    {
+                        "iteration": i.get("iteration", -1) + 1,  # 1-기반 인덱스로 변환
+                        "success": i.get("success", False),
+                        "converting": i.get("converting", False),
+                        "error": i.get("error", None),
+                        "hardware_evaluation": i.get("evaluation", {}).get("metrics", {}) if i.get("evaluation") else {}
+                    } for i in iterations_data
+                ],
+                "hardware_evaluation": hw_eval_data
+            }
+            
+            # 모드별 상세 정보도 동일하게 저장
+            project_summary[HARDWARE][mode][ITERATION_DETAILS][project_key] = project_summary[HARDWARE][ITERATION_DETAILS][project_key]
 
         if hw_data.get(CONVERTING):
             project_summary[HARDWARE][CONVERTING_SUCCESS] += 1
@@ -699,7 +762,7 @@ def process_hardware_result(data, mode, project_summary):
         return False # Indicate result was missing
 
 
-def process_codeware_result(data, mode, project_summary):
+def process_codeware_result(data, mode, project_summary, details_mode=DETAILS_SUCCESS):
     """Processes combined code+hardware (codeware) results."""
     result_key = f"{mode}_{CODEWARE}"
     if result_key in data:
@@ -742,91 +805,84 @@ def process_codeware_result(data, mode, project_summary):
                         project_summary[CODEWARE][SUCCESS_WITH_IMPROVEMENT] += 1
                         project_summary[CODEWARE][mode][SUCCESS_WITH_IMPROVEMENT] += 1
                 
-                # 각 반복 횟수별 점수 업데이트
+                # 각 반복 횟수별 점수 업데이트 (루프 밖에서 점수 딕셔너리를 미리 바인딩)
+                section_scores = project_summary[CODEWARE][ITERATION_SCORES]
+                mode_scores = project_summary[CODEWARE][mode][ITERATION_SCORES]
+                if mode == PHYSICAL:
+                    (ep_scores, dc_scores, ep_dc_scores, ia_scores,
+                     ep_ia_scores, dc_ia_scores, ep_dc_ia_scores) = [
+                        project_summary[CODEWARE][mode][key] for key in COND_ITERATION_SCORE_KEYS
+                    ]
                 for iter_data in iterations_data:
                     iter_num = iter_data.get("iteration", 0) + 1  # 0-기반 인덱스를 1-기반으로 변환
+                    iter_key = str(iter_num)
                     iter_success = iter_data.get("success", False)
                     
-                    # 성공한 iteration 및 그 이전 iteration만 점수 업데이트
-                    if str(iter_num) in project_summary[CODEWARE][ITERATION_SCORES] and (iter_success or iter_num <= iterations_to_success):
-                        # iteration이 성공했으면 1점, 아니면 0점
-                        if iter_success:
-                            project_summary[CODEWARE][ITERATION_SCORES][str(iter_num)] += 1
-                            project_summary[CODEWARE][mode][ITERATION_SCORES][str(iter_num)] += 1
+                    # 성공한 iteration만 1점 (실패한 iteration은 0점이므로 갱신할 필요 없음)
+                    if iter_success and iter_key in section_scores:
+                        section_scores[iter_key] += 1
+                        mode_scores[iter_key] += 1
                     
-                    # physical 모드에서 조건부 성공 점수 업데이트
-                    if mode == PHYSICAL and iter_data.get("hardware_evaluation") and isinstance(iter_data["hardware_evaluation"], dict):
+                    # physical 모드에서 조건부 성공 점수 업데이트 (성공한 iteration만 해당)
+                    # 조건부 점수 딕셔너리는 mode_scores와 같은 키를 가지므로 키 검사는 한 번만 수행
+                    if mode == PHYSICAL and iter_success and iter_key in mode_scores and iter_data.get("hardware_evaluation") and isinstance(iter_data["hardware_evaluation"], dict):
                         metrics = iter_data["hardware_evaluation"]
                         
                         # 조건부 성공 여부 계산
                         # endpoint_conflicts와 direct_connections의 조건부 성공 업데이트
                         endpoint_conflicts_count = metrics.get("endpoint_conflicts", {}).get("endpoint_conflicts", 1) if isinstance(metrics.get("endpoint_conflicts"), dict) else metrics.get("endpoint_conflicts", 1)
                         direct_connections_count = metrics.get("direct_connections", {}).get("direct_connections", 1) if isinstance(metrics.get("direct_connections"), dict) else metrics.get("direct_connections", 1)
-                        is_successful = iter_success
+                        no_ep = endpoint_conflicts_count == 0
+                        no_dc = direct_connections_count == 0
                         
                         # 조건부 성공 점수 업데이트
-                        if str(iter_num) in project_summary[CODEWARE][mode][ITERATION_SCORES_IF_NOT_ENDPOINT_CONFLICTS]:
-                            if is_successful and endpoint_conflicts_count == 0:
-                                project_summary[CODEWARE][mode][ITERATION_SCORES_IF_NOT_ENDPOINT_CONFLICTS][str(iter_num)] += 1
-                                
-                        if str(iter_num) in project_summary[CODEWARE][mode][ITERATION_SCORES_IF_NOT_DIRECT_CONNECTIONS]:
-                            if is_successful and direct_connections_count == 0:
-                                project_summary[CODEWARE][mode][ITERATION_SCORES_IF_NOT_DIRECT_CONNECTIONS][str(iter_num)] += 1
-                                
-                        if str(iter_num) in project_summary[CODEWARE][mode][ITERATION_SCORES_IF_NOT_ENDPOINT_CONFLICTS_DIRECT_CONNECTIONS]:
-                            if is_successful and endpoint_conflicts_count == 0 and direct_connections_count == 0:
-                                project_summary[CODEWARE][mode][ITERATION_SCORES_IF_NOT_ENDPOINT_CONFLICTS_DIRECT_CONNECTIONS][str(iter_num)] += 1
+                        if no_ep:
+                            ep_scores[iter_key] += 1
+                        if no_dc:
+                            dc_scores[iter_key] += 1
+                        if no_ep and no_dc:
+                            ep_dc_scores[iter_key] += 1
                                 
                         # 컴포넌트 속성 관련 조건부 성공 점수 업데이트
                         if "component_attrs" in metrics:
                             incorrect_attrs_count = metrics["component_attrs"].get("incorrect_attrs", 1) if isinstance(metrics["component_attrs"], dict) else metrics.get("incorrect_attrs", 1)
                             
-                            if str(iter_num) in project_summary[CODEWARE][mode][ITERATION_SCORES_IF_NOT_INCORRECT_ATTRS]:
-                                if is_successful and incorrect_attrs_count == 0:
-                                    project_summary[CODEWARE][mode][ITERATION_SCORES_IF_NOT_INCORRECT_ATTRS][str(iter_num)] += 1
-                                    
-                            if str(iter_num) in project_summary[CODEWARE][mode][ITERATION_SCORES_IF_NOT_ENDPOINT_CONFLICTS_INCORRECT_ATTRS]:
-                                if is_successful and endpoint_conflicts_count == 0 and incorrect_attrs_count == 0:
-                                    project_summary[CODEWARE][mode][ITERATION_SCORES_IF_NOT_ENDPOINT_CONFLICTS_INCORRECT_ATTRS][str(iter_num)] += 1
-                                    
-                            if str(iter_num) in project_summary[CODEWARE][mode][ITERATION_SCORES_IF_NOT_DIRECT_CONNECTIONS_INCORRECT_ATTRS]:
-                                if is_successful and direct_connections_count == 0 and incorrect_attrs_count == 0:
-                                    project_summary[CODEWARE][mode][ITERATION_SCORES_IF_NOT_DIRECT_CONNECTIONS_INCORRECT_ATTRS][str(iter_num)] += 1
-                                    
-                            if str(iter_num) in project_summary[CODEWARE][mode][ITERATION_SCORES_IF_NOT_ENDPOINT_CONFLICTS_DIRECT_CONNECTIONS_INCORRECT_ATTRS]:
-                                if is_successful and endpoint_conflicts_count == 0 and direct_connections_count == 0 and incorrect_attrs_count == 0:
-                                    project_summary[CODEWARE][mode][ITERATION_SCORES_IF_NOT_ENDPOINT_CONFLICTS_DIRECT_CONNECTIONS_INCORRECT_ATTRS][str(iter_num)] += 1
-                
-                # 상세 정보 저장
-                project_key = f"{model_name}_{project_name}"
-                if project_key not in project_summary[CODEWARE][ITERATION_DETAILS]:
-                    project_summary[CODEWARE][ITERATION_DETAILS][project_key] = {}
-                if project_key not in project_summary[CODEWARE][mode][ITERATION_DETAILS]:
-                    project_summary[CODEWARE][mode][ITERATION_DETAILS][project_key] = {}
-                
-                # 상세 정보에 각 iteration 결과 저장
-                project_summary[CODEWARE][ITERATION_DETAILS][project_key] = {
-                    "project": project_name,
-                    "model": model_name,
-                    "mode": mode,
-                    "final_success": final_success,
-                    "best_iteration": best_iteration,
-                    "iterations": [
-                        {
-                            "iteration": i.get("iteration", -1) + 1,  # 1-기반 인덱스로 변환
-                            "success": i.get("success", False),
-                            "compile_result": i.get("compile_result", False),
-                            "test_result": i.get("test_result", False),
-                            "hardware_success": i.get("hardware_success", False),
-                            "codebleu_score": i.get("codebleu_score", None),
-                            "error": i.get("error", None),
-                            "hardware_evaluation": i.get("hardware_evaluation", {})
-                        } for i in iterations_data
-                    ]
-                }
+                            if incorrect_attrs_count == 0:
+                                ia_scores[iter_key] += 1
+                                if no_ep:
+                                    ep_ia_scores[iter_key] += 1
+                                if no_dc:
+                                    dc_ia_scores[iter_key] += 1
+                                if no_ep and no_dc:
+                                    ep_dc_ia_scores[iter_key] += 1
                 
-                # 모드별 상세 정보도 동일하게 저장
-                project_summary[CODEWARE][mode][ITERATION_DETAILS][project_key] = project_summary[CODEWARE][ITERATION_DETAILS][project_key]
+        # 상세 정보 저장 (--details 옵션에 따라 생략)
+        if has_iterations and should_store_details(final_success, details_mode):
+            project_key = f"{model_name}_{project_name}"
+            
+            # 상세 정보에 각 iteration 결과 저장
+            project_summary[CODEWARE][ITERATION_DETAILS][project_key] = {
+                "project": project_name,
+                "model": model_name,
+                "mode": mode,
+                "final_success": final_success,
+                "best_iteration": best_iteration,
+                "iterations": [
+                    {
+                        "iteration": i.get("iteration", -1) + 1,  # 1-기반 인덱스로 변환
+                        "success": i.get("success", False),
+                        "compile_result": i.get("compile_result", False),
+                        "test_result": i.get("test_result", False),
+                        "hardware_success": i.get("hardware_success", False),
+                        "codebleu_score": i.get("codebleu_score", None),
+                        "error": i.get("error", None),
+                        "hardware_evaluation": i.get("hardware_evaluation", {})
+                    } for i in iterations_data
+                ]
+            }
+            
+            # 모드별 상세 정보도 동일하게 저장
+            project_summary[CODEWARE][mode][ITERATION_DETAILS][project_key] = project_summary[CODEWARE][ITERATION_DETAILS][project_key]
 
         if codeware_data.get(COMPILE_RESULT):
             project_summary[CODEWARE][mode][COMPILE_SUCCESS] += 1
@@ -891,17 +947,138 @@ def load_json(file_path, default=None):
 
 
 def save_json(data, file_path):
-    """Saves data to a JSON file with indentation."""
+    """Saves data to a JSON file with indentation (encoded in one call, written in one write)."""
     try:
         file_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(file_path, 'w') as f:
-            json.dump(data, f, indent=4)
+        # 요약 파일은 저장소에 커밋되므로 설치된 패키지와 무관하게 항상 같은 형식(4칸 들여쓰기)으로 저장
+        file_path.write_text(json.dumps(data, indent=4))
     except IOError as e:
         print(f"Error saving JSON to {file_path}: {e}", file=sys.stderr)
 
 
+def encode_json_line(data):
+    """Encodes data as a single compact JSON line (bytes, newline-terminated)."""
+    # 설치 환경에 따라 샤드 내용이 달라지지 않도록 표준 json 인코더 하나만 사용
+    return (json.dumps(data, separators=(",", ":")) + "\n").encode()
+
+
+def calculate_model_scores(model_summary):
+    """Calculates scores, CodeBLEU averages and HW metric averages of an aggregated model summary."""
+    # Calculate scores for the model summary
+    calculate_scores(model_summary)
+    # Calculate CodeBLEU average for the model summary
+    for section in (CODE, CODEWARE):
+        section_summary = model_summary[section]
+        for mode in MODES:
+            calculate_codebleu_averages(section_summary[mode])
+
+    # Calculate average hardware metrics for the model summary
+    for mode in MODES:
+        hardware_mode_summary = model_summary[HARDWARE][mode]
+        converting_success_count = hardware_mode_summary[CONVERTING_SUCCESS]
+        if converting_success_count > 0:
+            calculate_average_hardware_metrics(hardware_mode_summary[HW_EVAL], converting_success_count)
+            if mode == PHYSICAL:
+                recalculate_physical_hw_percentages(hardware_mode_summary[HW_EVAL])
+
+    # Codeware section HW metrics average
+    for mode in MODES:
+        codeware_mode_summary = model_summary[CODEWARE][mode]
+        codeware_total_count = codeware_mode_summary[TOTAL]
+        if codeware_total_count > 0 and HW_EVAL in codeware_mode_summary:
+            calculate_average_hardware_metrics(codeware_mode_summary[HW_EVAL], codeware_total_count)
+            if mode == PHYSICAL:
+                recalculate_physical_hw_percentages(codeware_mode_summary[HW_EVAL])
+
+
+def load_model_projects(model_dir, details_mode=DETAILS_SUCCESS):
+    """
+    Loads and processes every project result file of a single model.
+
+    Returns:
+        List of (project_name, project_summary) tuples.
+        Project summaries hold raw counts; scores are calculated by the caller.
+    """
+    model_name = model_dir.name
+    project_results = []
+
+    # Iterate through projects for the current model
+    projects = [d for d in model_dir.iterdir() if d.is_dir()]
+    for project_dir in projects:
+        project_name = project_dir.name
+        project_summary = create_metrics_structure()
+        project_summary['project'] = project_name
+        project_summary['model'] = model_name # Keep model info for individual file
+
+        # Iterate through result files for the current project
+        result_files = list(project_dir.glob("*.json"))
+        if not result_files:
+            print(f"  No result files found for project: {project_name}")
+            continue
+
+        for result_file in result_files:
+            data = load_json(result_file, default={})
+            if not data: # Skip if file couldn't be loaded
+                continue
+
+            # Inject identifiers for better error messages
+            data['model'] = model_name
+            data['project'] = project_name
+
+            # Process results for each type if present
+            process_code_result(data, LOGICAL, project_summary, details_mode)
+            process_code_result(data, PHYSICAL, project_summary, details_mode)
+            process_hardware_result(data, LOGICAL, project_summary, details_mode)
+            process_hardware_result(data, PHYSICAL, project_summary, details_mode)
+            process_codeware_result(data, LOGICAL, project_summary, details_mode)
+            process_codeware_result(data, PHYSICAL, project_summary, details_mode)
+
+        if project_summary[TOTAL] == 0: # Check if any results were processed
+             print(f"  No valid results processed for project: {project_name}. Skipping summary aggregation.")
+             continue # Skip aggregation if no results were processed
+
+        project_results.append((project_name, project_summary))
+
+    return project_results
+
+
+def collect_model_projects(model_dir, details_mode=DETAILS_SUCCESS):
+    """
+    Runs load_model_projects() in a worker process.
+
+    Console output is captured and returned so the main process can print it in model order.
+
+    Returns:
+        Tuple of (project results, stdout text, stderr text)
+    """
+    log_output, error_output = io.StringIO(), io.StringIO()
+    with redirect_stdout(log_output), redirect_stderr(error_output):
+        project_results = load_model_projects(model_dir, details_mode)
+    return project_results, log_output.getvalue(), error_output.getvalue()
+
+
+def positive_int(value):
+    """argparse type for options that require an integer of at least 1."""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: {value!r}")
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+
 def main():
     """Main function to summarize experiment results."""
+    parser = argparse.ArgumentParser(description="Summarize experiment results")
+    parser.add_argument("--details", choices=DETAILS_CHOICES, default=DETAILS_SUCCESS,
+                        help="Which results keep per-iteration details (all, success, or none)")
+    parser.add_argument("--workers", type=positive_int, default=None,
+                        help="Number of worker processes for loading model results (default: CPU count, 1 disables multiprocessing)")
+    parser.add_argument("--model-project-output", choices=MODEL_PROJECT_OUTPUT_CHOICES, default=MODEL_PROJECT_OUTPUT_FILES,
+                        help="Save model-project summaries as one JSON file per model (files) or as a single NDJSON shard (jsonl)")
+    args = parser.parse_args()
+
     # Create summary directories if they don't exist
     SUMMARY_DIR.mkdir(exist_ok=True)
     MODEL_PROJECT_SUMMARY_DIR.mkdir(exist_ok=True)
@@ -913,277 +1090,167 @@ def main():
 
     # Iterate through models
     models = [d for d in EXPERIMENTS_DIR.iterdir() if d.is_dir() and d.name != SUMMARY_DIR_NAME]
-    for model_dir in models:
-        model_name = model_dir.name
-        model_summary = create_metrics_structure()
-        model_summary['model'] = model_name # Add model name for context
-        # 모델별 프로젝트 요약을 저장할 딕셔너리 초기화
-        model_projects_summary[model_name] = {}
-
-        print(f"Processing model: {model_name}...")
-
-        # Iterate through projects for the current model
-        projects = [d for d in model_dir.iterdir() if d.is_dir()]
-        for project_dir in projects:
-            project_name = project_dir.name
-            project_summary = create_metrics_structure()
-            project_summary['project'] = project_name
-            project_summary['model'] = model_name # Keep model info for individual file
-
-            # Iterate through result files for the current project
-            result_files = list(project_dir.glob("*.json"))
-            if not result_files:
-                print(f"  No result files found for project: {project_name}")
-                continue
 
-            for result_file in result_files:
-                data = load_json(result_file, default={})
-                if not data: # Skip if file couldn't be loaded
-                    continue
-
-                # Inject identifiers for better error messages
-                data['model'] = model_name
-                data['project'] = project_name
-
-                # Process results for each type if present
-                process_code_result(data, LOGICAL, project_summary)
-                process_code_result(data, PHYSICAL, project_summary)
-                process_hardware_result(data, LOGICAL, project_summary)
-                process_hardware_result(data, PHYSICAL, project_summary)
-                process_codeware_result(data, LOGICAL, project_summary)
-                process_codeware_result(data, PHYSICAL, project_summary)
-
-            if project_summary[TOTAL] == 0: # Check if any results were processed
-                 print(f"  No valid results processed for project: {project_name}. Skipping summary aggregation.")
-                 continue # Skip aggregation if no results were processed
-
-            # Aggregate project results into model summary
-            aggregate_metrics(project_summary, model_summary)
-
-            # Aggregate project results into the overall project summary
-            if project_name in all_projects_summary:
-                aggregate_metrics(project_summary, all_projects_summary[project_name])
+    # 모델별 결과 파일 로드/처리는 서로 독립적이므로 병렬로 수행하고,
+    # 모델 간 집계(all_projects_summary)는 기존 순서대로 메인 프로세스에서 결과가 도착하는 대로 수행
+    # (--workers 1이면 프로세스 풀 없이 메인 프로세스에서 처리하며 출력을 그대로 표시)
+    if args.workers == 1:
+        executor_context = nullcontext()
+    else:
+        executor_context = ProcessPoolExecutor(max_workers=args.workers)
+
+    # jsonl 모드에서는 샤드 파일을 한 번만 열어 모델별 요약을 순서대로 기록
+    # files 모드에서는 이전 실행에서 남은 샤드가 최신 파일보다 우선 읽히지 않도록 제거
+    # (with 블록을 벗어나면 예외가 발생해도 샤드 파일이 닫히고 기록된 내용이 flush됨)
+    if args.model_project_output == MODEL_PROJECT_OUTPUT_JSONL:
+        shard_context = open(MODEL_PROJECT_SUMMARY_SHARD_FILE, 'wb')
+    else:
+        MODEL_PROJECT_SUMMARY_SHARD_FILE.unlink(missing_ok=True)
+        shard_context = nullcontext()
+
+    with executor_context as executor, shard_context as shard_file:
+        if executor is not None:
+            model_results = executor.map(collect_model_projects, models, [args.details] * len(models))
+        for model_dir in models:
+            model_name = model_dir.name
+            model_summary = create_metrics_structure()
+
+            print(f"Processing model: {model_name}...")
+            if executor is None:
+                project_results = load_model_projects(model_dir, args.details)
             else:
-                # Create a copy and remove model name for the general project summary
-                all_projects_summary[project_name] = project_summary.copy()
-                del all_projects_summary[project_name]['model']
-
-            # Aggregate sum/count for CodeBLEU manually (after general aggregation)
-            if project_name in all_projects_summary: # Check necessary for the first time
-                for mode in [LOGICAL, PHYSICAL]:
-                    # 기존 CodeBLEU 합계 및 카운트 업데이트
-                    sum_key_code = CODEBLEU_SCORE_SUM
-                    count_key_code = CODEBLEU_SCORE_COUNT
-                    if sum_key_code in project_summary[CODE][mode]:
-                       all_projects_summary[project_name][CODE][mode][sum_key_code] += project_summary[CODE][mode][sum_key_code]
-                       all_projects_summary[project_name][CODE][mode][count_key_code] += project_summary[CODE][mode][count_key_code]
+                project_results, log_output, error_output = next(model_results)
+                sys.stdout.write(log_output)
+                sys.stderr.write(error_output)
+
+            for project_name, project_summary in project_results:
+                # Aggregate project results into model summary
+                aggregate_metrics(project_summary, model_summary)
+
+                # Aggregate project results into the overall project summary
+                if project_name in all_projects_summary:
+                    aggregate_metrics(project_summary, all_projects_summary[project_name])
+                else:
+                    # Create a copy and remove model name for the general project summary
+                    all_projects_summary[project_name] = project_summary.copy()
+                    del all_projects_summary[project_name]['model']
+
+                # Aggregate sum/count for CodeBLEU manually (after general aggregation)
+                if project_name in all_projects_summary: # Check necessary for the first time
+                    for mode in MODES:
+                        # 기존 CodeBLEU 합계 및 카운트 업데이트
+                        sum_key_code = CODEBLEU_SCORE_SUM
+                        count_key_code = CODEBLEU_SCORE_COUNT
+                        if sum_key_code in project_summary[CODE][mode]:
+                           all_projects_summary[project_name][CODE][mode][sum_key_code] += project_summary[CODE][mode][sum_key_code]
+                           all_projects_summary[project_name][CODE][mode][count_key_code] += project_summary[CODE][mode][count_key_code]
                     
-                    # 성공/실패 CodeBLEU 합계 및 카운트 업데이트
-                    success_sum_key = CODEBLEU_SCORE_SUCCESS_SUM
-                    success_count_key = CODEBLEU_SCORE_SUCCESS_COUNT
-                    fail_sum_key = CODEBLEU_SCORE_FAIL_SUM
-                    fail_count_key = CODEBLEU_SCORE_FAIL_COUNT
+                        # 성공/실패 CodeBLEU 합계 및 카운트 업데이트
+                        success_sum_key = CODEBLEU_SCORE_SUCCESS_SUM
+                        success_count_key = CODEBLEU_SCORE_SUCCESS_COUNT
+                        fail_sum_key = CODEBLEU_SCORE_FAIL_SUM
+                        fail_count_key = CODEBLEU_SCORE_FAIL_COUNT
                     
-                    if success_sum_key in project_summary[CODE][mode]:
-                        all_projects_summary[project_name][CODE][mode][success_sum_key] += project_summary[CODE][mode][success_sum_key]
-                        all_projects_summary[project_name][CODE][mode][success_count_key] += project_summary[CODE][mode][success_count_key]
+                        if success_sum_key in project_summary[CODE][mode]:
+                            all_projects_summary[project_name][CODE][mode][success_sum_key] += project_summary[CODE][mode][success_sum_key]
+                            all_projects_summary[project_name][CODE][mode][success_count_key] += project_summary[CODE][mode][success_count_key]
                     
-                    if fail_sum_key in project_summary[CODE][mode]:
-                        all_projects_summary[project_name][CODE][mode][fail_sum_key] += project_summary[CODE][mode][fail_sum_key]
-                        all_projects_summary[project_name][CODE][mode][fail_count_key] += project_summary[CODE][mode][fail_count_key]
+                        if fail_sum_key in project_summary[CODE][mode]:
+                            all_projects_summary[project_name][CODE][mode][fail_sum_key] += project_summary[CODE][mode][fail_sum_key]
+                            all_projects_summary[project_name][CODE][mode][fail_count_key] += project_summary[CODE][mode][fail_count_key]
                     
-                    # Codeware 관련 CodeBLEU 업데이트
-                    sum_key_codeware = CODEBLEU_SCORE_SUM
-                    count_key_codeware = CODEBLEU_SCORE_COUNT
-                    if sum_key_codeware in project_summary[CODEWARE][mode]:
-                       all_projects_summary[project_name][CODEWARE][mode][sum_key_codeware] += project_summary[CODEWARE][mode][sum_key_codeware]
-                       all_projects_summary[project_name][CODEWARE][mode][count_key_codeware] += project_summary[CODEWARE][mode][count_key_codeware]
+                        # Codeware 관련 CodeBLEU 업데이트
+                        sum_key_codeware = CODEBLEU_SCORE_SUM
+                        count_key_codeware = CODEBLEU_SCORE_COUNT
+                        if sum_key_codeware in project_summary[CODEWARE][mode]:
+                           all_projects_summary[project_name][CODEWARE][mode][sum_key_codeware] += project_summary[CODEWARE][mode][sum_key_codeware]
+                           all_projects_summary[project_name][CODEWARE][mode][count_key_codeware] += project_summary[CODEWARE][mode][count_key_codeware]
                     
-                    # Codeware 성공/실패 CodeBLEU 합계 및 카운트 업데이트
-                    if success_sum_key in project_summary[CODEWARE][mode]:
-                        all_projects_summary[project_name][CODEWARE][mode][success_sum_key] += project_summary[CODEWARE][mode][success_sum_key]
-                        all_projects_summary[project_name][CODEWARE][mode][success_count_key] += project_summary[CODEWARE][mode][success_count_key]
+                        # Codeware 성공/실패 CodeBLEU 합계 및 카운트 업데이트
+                        if success_sum_key in project_summary[CODEWARE][mode]:
+                            all_projects_summary[project_name][CODEWARE][mode][success_sum_key] += project_summary[CODEWARE][mode][success_sum_key]
+                            all_projects_summary[project_name][CODEWARE][mode][success_count_key] += project_summary[CODEWARE][mode][success_count_key]
                     
-                    if fail_sum_key in project_summary[CODEWARE][mode]:
-                        all_projects_summary[project_name][CODEWARE][mode][fail_sum_key] += project_summary[CODEWARE][mode][fail_sum_key]
-                        all_projects_summary[project_name][CODEWARE][mode][fail_count_key] += project_summary[CODEWARE][mode][fail_count_key]
-            else: # First time adding this project, sums/counts are already in the copy
-                 pass
-
-            # Aggregate Hardware metrics manually for Codeware section
-            if project_name in all_projects_summary:
-                 for mode in [LOGICAL, PHYSICAL]:
-                     if HW_EVAL in project_summary[CODEWARE][mode]:
-                         source_hw_eval = project_summary[CODEWARE][mode][HW_EVAL]
-                         target_hw_eval = all_projects_summary[project_name][CODEWARE][mode][HW_EVAL]
-                         for key, value in source_hw_eval.items():
-                              if key in target_hw_eval and isinstance(value, (int, float)):
-                                  target_hw_eval[key] += value
-                     # Aggregate derived success metrics (outside HW_EVAL)
-                     if mode == PHYSICAL:
-                         source_phys_summary = project_summary[CODEWARE][PHYSICAL]
-                         target_phys_summary = all_projects_summary[project_name][CODEWARE][PHYSICAL]
-                         for key in [SUCCESS_IF_NOT_ENDPOINT_CONFLICTS, SUCCESS_IF_NOT_DIRECT_CONNECTIONS, SUCCESS_IF_NOT_ENDPOINT_CONFLICTS_DIRECT_CONNECTIONS]:
-                             if key in source_phys_summary:
-                                 target_phys_summary[key] += source_phys_summary[key]
-
-            # Calculate scores for the individual project summary (including CodeBLEU average)
-            calculate_scores(project_summary) # Calculates general score
-            for mode in [LOGICAL, PHYSICAL]: # Calculate CodeBLEU average
-                count_code = project_summary[CODE][mode][CODEBLEU_SCORE_COUNT]
-                if count_code > 0:
-                    project_summary[CODE][mode][CODEBLEU_SCORE] = project_summary[CODE][mode][CODEBLEU_SCORE_SUM] / count_code
-                
-                # 성공/실패 케이스 CodeBLEU 평균 계산 추가
-                success_count = project_summary[CODE][mode][CODEBLEU_SCORE_SUCCESS_COUNT]
-                if success_count > 0:
-                    project_summary[CODE][mode][CODEBLEU_SCORE_SUCCESS] = project_summary[CODE][mode][CODEBLEU_SCORE_SUCCESS_SUM] / success_count
-                    
-                fail_count = project_summary[CODE][mode][CODEBLEU_SCORE_FAIL_COUNT]
-                if fail_count > 0:
-                    project_summary[CODE][mode][CODEBLEU_SCORE_FAIL] = project_summary[CODE][mode][CODEBLEU_SCORE_FAIL_SUM] / fail_count
-
-            # Calculate average HW metrics for Codeware section in individual project summary
-            for mode in [LOGICAL, PHYSICAL]:
-                 codeware_total_count = project_summary[CODEWARE][mode][TOTAL]
-                 if codeware_total_count > 0 and HW_EVAL in project_summary[CODEWARE][mode]:
-                      calculate_average_hardware_metrics(project_summary[CODEWARE][mode][HW_EVAL], codeware_total_count)
-                      if mode == PHYSICAL:
-                           recalculate_physical_hw_percentages(project_summary[CODEWARE][mode][HW_EVAL])
-
-            # Calculate derived HW success scores for individual project summary
-            phys_hw_summary = project_summary[HARDWARE][PHYSICAL]
-            total_hw_phys = phys_hw_summary[TOTAL]
-            if total_hw_phys > 0:
-                phys_hw_summary[SCORE_IF_NOT_ENDPOINT_CONFLICTS] = phys_hw_summary[SUCCESS_IF_NOT_ENDPOINT_CONFLICTS] / total_hw_phys
-                phys_hw_summary[SCORE_IF_NOT_DIRECT_CONNECTIONS] = phys_hw_summary[SUCCESS_IF_NOT_DIRECT_CONNECTIONS] / total_hw_phys
-                phys_hw_summary[SCORE_IF_NOT_ENDPOINT_CONFLICTS_DIRECT_CONNECTIONS] = phys_hw_summary[SUCCESS_IF_NOT_ENDPOINT_CONFLICTS_DIRECT_CONNECTIONS] / total_hw_phys
-                # 컴포넌트 속성 관련 성공 비율 계산
-                phys_hw_summary[SCORE_IF_NOT_INCORRECT_ATTRS] = phys_hw_summary[SUCCESS_IF_NOT_INCORRECT_ATTRS] / total_hw_phys
-                phys_hw_summary[SCORE_IF_NOT_ENDPOINT_CONFLICTS_INCORRECT_ATTRS] = phys_hw_summary[SUCCESS_IF_NOT_ENDPOINT_CONFLICTS_INCORRECT_ATTRS] / total_hw_phys
-                phys_hw_summary[SCORE_IF_NOT_DIRECT_CONNECTIONS_INCORRECT_ATTRS] = phys_hw_summary[SUCCESS_IF_NOT_DIRECT_CONNECTIONS_INCORRECT_ATTRS] / total_hw_phys
-                phys_hw_summary[SCORE_IF_NOT_ENDPOINT_CONFLICTS_DIRECT_CONNECTIONS_INCORRECT_ATTRS] = phys_hw_summary[SUCCESS_IF_NOT_ENDPOINT_CONFLICTS_DIRECT_CONNECTIONS_INCORRECT_ATTRS] / total_hw_phys
-                
-            phys_cw_summary = project_summary[CODEWARE][PHYSICAL]
-            total_cw_phys = phys_cw_summary[TOTAL]
-            if total_cw_phys > 0:
-                phys_cw_summary[SCORE_IF_NOT_ENDPOINT_CONFLICTS] = phys_cw_summary[SUCCESS_IF_NOT_ENDPOINT_CONFLICTS] / total_cw_phys
-                phys_cw_summary[SCORE_IF_NOT_DIRECT_CONNECTIONS] = phys_cw_summary[SUCCESS_IF_NOT_DIRECT_CONNECTIONS] / total_cw_phys
-                phys_cw_summary[SCORE_IF_NOT_ENDPOINT_CONFLICTS_DIRECT_CONNECTIONS] = phys_cw_summary[SUCCESS_IF_NOT_ENDPOINT_CONFLICTS_DIRECT_CONNECTIONS] / total_cw_phys
-                # 컴포넌트 속성 관련 성공 비율 계산
-                phys_cw_summary[SCORE_IF_NOT_INCORRECT_ATTRS] = phys_cw_summary[SUCCESS_IF_NOT_INCORRECT_ATTRS] / total_cw_phys
-                phys_cw_summary[SCORE_IF_NOT_ENDPOINT_CONFLICTS_INCORRECT_ATTRS] = phys_cw_summary[SUCCESS_IF_NOT_ENDPOINT_CONFLICTS_INCORRECT_ATTRS] / total_cw_phys
-                phys_cw_summary[SCORE_IF_NOT_DIRECT_CONNECTIONS_INCORRECT_ATTRS] = phys_cw_summary[SUCCESS_IF_NOT_DIRECT_CONNECTIONS_INCORRECT_ATTRS] / total_cw_phys
-                phys_cw_summary[SCORE_IF_NOT_ENDPOINT_CONFLICTS_DIRECT_CONNECTIONS_INCORRECT_ATTRS] = phys_cw_summary[SUCCESS_IF_NOT_ENDPOINT_CONFLICTS_DIRECT_CONNECTIONS_INCORRECT_ATTRS] / total_cw_phys
-
-            # 각 프로젝트 결과를 모델별 딕셔너리에 추가
-            model_projects_summary[model_name][project_name] = project_summary
-
-        # Calculate scores for the model summary
-        calculate_scores(model_summary)
-        # Calculate CodeBLEU average for the model summary
-        for mode in [LOGICAL, PHYSICAL]:
-            count_code = model_summary[CODE][mode][CODEBLEU_SCORE_COUNT]
-            if count_code > 0:
-                 model_summary[CODE][mode][CODEBLEU_SCORE] = model_summary[CODE][mode][CODEBLEU_SCORE_SUM] / count_code
-            
-            # 성공/실패 케이스 CodeBLEU 평균 계산 추가
-            success_count_code = model_summary[CODE][mode][CODEBLEU_SCORE_SUCCESS_COUNT]
-            if success_count_code > 0:
-                 model_summary[CODE][mode][CODEBLEU_SCORE_SUCCESS] = model_summary[CODE][mode][CODEBLEU_SCORE_SUCCESS_SUM] / success_count_code
-            
-            fail_count_code = model_summary[CODE][mode][CODEBLEU_SCORE_FAIL_COUNT]
-            if fail_count_code > 0:
-                 model_summary[CODE][mode][CODEBLEU_SCORE_FAIL] = model_summary[CODE][mode][CODEBLEU_SCORE_FAIL_SUM] / fail_count_code
-
-            count_codeware = model_summary[CODEWARE][mode][CODEBLEU_SCORE_COUNT]
-            if count_codeware > 0:
-                 model_summary[CODEWARE][mode][CODEBLEU_SCORE] = model_summary[CODEWARE][mode][CODEBLEU_SCORE_SUM] / count_codeware
-            
-            # 성공/실패 케이스 CodeBLEU 평균 계산 추가
-            success_count_codeware = model_summary[CODEWARE][mode][CODEBLEU_SCORE_SUCCESS_COUNT]
-            if success_count_codeware > 0:
-                 model_summary[CODEWARE][mode][CODEBLEU_SCORE_SUCCESS] = model_summary[CODEWARE][mode][CODEBLEU_SCORE_SUCCESS_SUM] / success_count_codeware
-            
-            fail_count_codeware = model_summary[CODEWARE][mode][CODEBLEU_SCORE_FAIL_COUNT]
-            if fail_count_codeware > 0:
-                 model_summary[CODEWARE][mode][CODEBLEU_SCORE_FAIL] = model_summary[CODEWARE][mode][CODEBLEU_SCORE_FAIL_SUM] / fail_count_codeware
-
-        # Calculate average hardware metrics for the model summary
-        if model_summary[HARDWARE][LOGICAL][CONVERTING_SUCCESS] > 0:
-             calculate_average_hardware_metrics(
-                 model_summary[HARDWARE][LOGICAL][HW_EVAL],
-                 model_summary[HARDWARE][LOGICAL][CONVERTING_SUCCESS]
-            )
-        if model_summary[HARDWARE][PHYSICAL][CONVERTING_SUCCESS] > 0:
-            calculate_average_hardware_metrics(
-                model_summary[HARDWARE][PHYSICAL][HW_EVAL],
-                model_summary[HARDWARE][PHYSICAL][CONVERTING_SUCCESS]
-            )
-            recalculate_physical_hw_percentages(model_summary[HARDWARE][PHYSICAL][HW_EVAL])
-
-        # Codeware section HW metrics average
-        for mode in [LOGICAL, PHYSICAL]:
-            codeware_total_count = model_summary[CODEWARE][mode][TOTAL]
-            if codeware_total_count > 0 and HW_EVAL in model_summary[CODEWARE][mode]:
-                calculate_average_hardware_metrics(model_summary[CODEWARE][mode][HW_EVAL], codeware_total_count)
-                if mode == PHYSICAL:
-                    recalculate_physical_hw_percentages(model_summary[CODEWARE][mode][HW_EVAL])
-
-        # Store model summary (remove model name as it's the key)
-        del model_summary['model']
-        all_models_summary[model_name] = model_summary
-
-        # 모델별 프로젝트 요약 파일 저장 (모델별 하나의、파일로)
-        model_summary_file = MODEL_PROJECT_SUMMARY_DIR / f"{model_name}.json"
-        save_json(model_projects_summary[model_name], model_summary_file)
+                        if fail_sum_key in project_summary[CODEWARE][mode]:
+                            all_projects_summary[project_name][CODEWARE][mode][fail_sum_key] += project_summary[CODEWARE][mode][fail_sum_key]
+                            all_projects_summary[project_name][CODEWARE][mode][fail_count_key] += project_summary[CODEWARE][mode][fail_count_key]
+                else: # First time adding this project, sums/counts are already in the copy
+                     pass
+
+                # Aggregate Hardware metrics manually for Codeware section
+                if project_name in all_projects_summary:
+                     for mode in MODES:
+                         if HW_EVAL in project_summary[CODEWARE][mode]:
+                             source_hw_eval = project_summary[CODEWARE][mode][HW_EVAL]
+                             target_hw_eval = all_projects_summary[project_name][CODEWARE][mode][HW_EVAL]
+                             for key, value in source_hw_eval.items():
+                                  if key in target_hw_eval and isinstance(value, (int, float)):
+                                      target_hw_eval[key] += value
+                         # Aggregate derived success metrics (outside HW_EVAL)
+                         if mode == PHYSICAL:
+                             source_phys_summary = project_summary[CODEWARE][PHYSICAL]
+                             target_phys_summary = all_projects_summary[project_name][CODEWARE][PHYSICAL]
+                             for key in [SUCCESS_IF_NOT_ENDPOINT_CONFLICTS, SUCCESS_IF_NOT_DIRECT_CONNECTIONS, SUCCESS_IF_NOT_ENDPOINT_CONFLICTS_DIRECT_CONNECTIONS]:
+                                 if key in source_phys_summary:
+                                     target_phys_summary[key] += source_phys_summary[key]
+
+                # Calculate scores for the individual project summary (including CodeBLEU average)
+                calculate_scores(project_summary) # Calculates general score
+                for mode in MODES: # Calculate CodeBLEU average
+                    calculate_codebleu_averages(project_summary[CODE][mode])
+
+                # Calculate average HW metrics for Codeware section in individual project summary
+                for mode in MODES:
+                     codeware_mode_summary = project_summary[CODEWARE][mode]
+                     codeware_total_count = codeware_mode_summary[TOTAL]
+                     if codeware_total_count > 0 and HW_EVAL in codeware_mode_summary:
+                          calculate_average_hardware_metrics(codeware_mode_summary[HW_EVAL], codeware_total_count)
+                          if mode == PHYSICAL:
+                               recalculate_physical_hw_percentages(codeware_mode_summary[HW_EVAL])
+
+                # Calculate derived HW success scores for individual project summary
+                calculate_conditional_scores(project_summary[HARDWARE][PHYSICAL])
+                calculate_conditional_scores(project_summary[CODEWARE][PHYSICAL])
+
+            # 처리된 결과가 없는 모델은 모든 값이 0이므로 점수/평균 계산을 건너뜀
+            if model_summary[TOTAL] > 0:
+                calculate_model_scores(model_summary)
+
+            # Store model summary (model name is the key)
+            all_models_summary[model_name] = model_summary
+
+            # 모델별 프로젝트 요약 파일 저장 (모델별 하나의、파일로)
+            # 프로젝트 요약은 위에서 제자리 갱신되므로 저장 직전에 한 번에 구성
+            model_projects_summary[model_name] = {
+                project_name: project_summary for project_name, project_summary in project_results
+            }
+            if shard_file is not None:
+                shard_file.write(encode_json_line({"model": model_name, "projects": model_projects_summary[model_name]}))
+            else:
+                model_summary_file = MODEL_PROJECT_SUMMARY_DIR / f"{model_name}.json"
+                save_json(model_projects_summary[model_name], model_summary_file)
 
     # --- Final Calculations and Saving ---
 
     # Calculate scores for the overall project summary
     calculate_scores(all_projects_summary) # Operates recursively
-    # Calculate CodeBLEU average for the overall project summary
-    for project_data in all_projects_summary.values():
-        for mode in [LOGICAL, PHYSICAL]:
-            if CODE in project_data and mode in project_data[CODE]:
-                count = project_data[CODE][mode].get(CODEBLEU_SCORE_COUNT, 0)
-                if count > 0:
-                    project_data[CODE][mode][CODEBLEU_SCORE] = project_data[CODE][mode].get(CODEBLEU_SCORE_SUM, 0.0) / count
-            
-                # 성공/실패 케이스 CodeBLEU 평균 계산 추가
-                success_count = project_data[CODE][mode].get(CODEBLEU_SCORE_SUCCESS_COUNT, 0)
-                if success_count > 0:
-                    project_data[CODE][mode][CODEBLEU_SCORE_SUCCESS] = project_data[CODE][mode].get(CODEBLEU_SCORE_SUCCESS_SUM, 0.0) / success_count
-                    
-                fail_count = project_data[CODE][mode].get(CODEBLEU_SCORE_FAIL_COUNT, 0)
-                if fail_count > 0:
-                    project_data[CODE][mode][CODEBLEU_SCORE_FAIL] = project_data[CODE][mode].get(CODEBLEU_SCORE_FAIL_SUM, 0.0) / fail_count
-
-            if CODEWARE in project_data and mode in project_data[CODEWARE]:
-                count = project_data[CODEWARE][mode].get(CODEBLEU_SCORE_COUNT, 0)
-                if count > 0:
-                    project_data[CODEWARE][mode][CODEBLEU_SCORE] = project_data[CODEWARE][mode].get(CODEBLEU_SCORE_SUM, 0.0) / count
-                
-                # 성공/실패 케이스 CodeBLEU 평균 계산 추가
-                success_count = project_data[CODEWARE][mode].get(CODEBLEU_SCORE_SUCCESS_COUNT, 0)
-                if success_count > 0:
-                    project_data[CODEWARE][mode][CODEBLEU_SCORE_SUCCESS] = project_data[CODEWARE][mode].get(CODEBLEU_SCORE_SUCCESS_SUM, 0.0) / success_count
-                    
-                fail_count = project_data[CODEWARE][mode].get(CODEBLEU_SCORE_FAIL_COUNT, 0)
-                if fail_count > 0:
-                    project_data[CODEWARE][mode][CODEBLEU_SCORE_FAIL] = project_data[CODEWARE][mode].get(CODEBLEU_SCORE_FAIL_SUM, 0.0) / fail_count
-
-    # Recalculate physical hardware percentages for the overall project summary
+    # Calculate CodeBLEU averages and recalculate physical hardware percentages
+    # for the overall project summary in a single pass
     for project_data in all_projects_summary.values():
-        if HARDWARE in project_data and PHYSICAL in project_data[HARDWARE]:
-             physical_hw_eval_sum = project_data[HARDWARE][PHYSICAL].get(HW_EVAL)
-             if physical_hw_eval_sum:
-                 recalculate_physical_hw_percentages(physical_hw_eval_sum)
-        if CODEWARE in project_data and PHYSICAL in project_data[CODEWARE]:
-             physical_hw_eval_sum_cw = project_data[CODEWARE][PHYSICAL].get(HW_EVAL)
-             if physical_hw_eval_sum_cw:
-                 recalculate_physical_hw_percentages(physical_hw_eval_sum_cw)
-
+        # 섹션 dict를 한 번만 조회하고 모드별 dict를 바로 사용
+        for section in (CODE, CODEWARE):
+            section_data = project_data.get(section)
+            if section_data:
+                for mode in MODES:
+                    mode_data = section_data.get(mode)
+                    if mode_data:
+                        calculate_codebleu_averages(mode_data)
+        for section in (HARDWARE, CODEWARE):
+            physical_data = project_data.get(section, {}).get(PHYSICAL)
+            if physical_data:
+                physical_hw_eval_sum = physical_data.get(HW_EVAL)
+                if physical_hw_eval_sum:
+                    recalculate_physical_hw_percentages(physical_hw_eval_sum)
 
     # Save final summary files
     save_json(all_projects_summary, ALL_PROJECT_SUMMARY_FILE)
@@ -1192,7 +1259,10 @@ def main():
     print("Summary generation complete.")
     print(f"Overall project summary saved to: {ALL_PROJECT_SUMMARY_FILE}")
     print(f"Overall model summary saved to: {ALL_MODEL_SUMMARY_FILE}")
-    print(f"Model-project summaries saved in: {MODEL_PROJECT_SUMMARY_DIR}")
+    if args.model_project_output == MODEL_PROJECT_OUTPUT_JSONL:
+        print(f"Model-project summaries saved to: {MODEL_PROJECT_SUMMARY_SHARD_FILE}")
+    else:
+        print(f"Model-project summaries saved in: {MODEL_PROJECT_SUMMARY_DIR}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -3,11 +3,71 @@
 # Common utilities for Arduino LLM testing modules
 
 import os
+import re
+import string
 import json
 import yaml
+import sqlite3
+import hashlib
+import functools
 import subprocess
 import requests
 import time
+import threading
+import signal
+from collections import defaultdict, deque
+from pathlib import Path
+from requests.adapters import HTTPAdapter
+
+try:
+    from yaml import CSafeLoader as YamlSafeLoader  # libyaml C 바인딩이 있으면 사용
+except ImportError:
+    from yaml import SafeLoader as YamlSafeLoader
+
+try:
+    import orjson  # 선택적 의존성: 설치되어 있으면 JSON 파싱에 사용
+except ImportError:
+    orjson = None
+
+# HTTP API 제공자별 요청 한도: 분당 요청 수(rpm), 분당 토큰 수(tpm), 동시 요청 수
+# 기본값은 제한 없음. 환경 변수 <PROVIDER>_RPM / <PROVIDER>_TPM / <PROVIDER>_MAX_CONCURRENT로 설정한
+# 한도만 프로세스 단위로 적용 (예: OPENAI_RPM=10). 여러 프로세스를 동시에 실행할 때는 프로세스당 몫으로 설정
+RATE_LIMIT_NAMES = ("rpm", "tpm", "max_concurrent")
+# rate limit(429) 발생 시 최대 재시도 횟수
+MAX_RATE_LIMIT_RETRIES = 8
+# Retry-After 헤더가 없을 때 지수 백오프(1, 2, 4, ... 초) 대기 시간의 상한(초)
+MAX_RATE_LIMIT_BACKOFF = 60
+
+# 제공자별 기본 모델: (환경 변수 이름, 기본값)
+LLM_MODEL_DEFAULTS = {
+    "openai": ("OPENAI_MODEL", "gpt-4o"),
+    "anthropic": ("ANTHROPIC_MODEL", "claude-3-opus-20240229"),
+    "gemini": ("GEMINI_MODEL", "gemini-2.0-flash-lite"),
+    "ollama": ("OLLAMA_MODEL", "llama3"),
+}
+# wokwi-cli 테스트 출력(stdout/stderr)에서 보관할 최대 줄 수 (마지막 줄들만 유지)
+WOKWI_OUTPUT_MAX_LINES = 5000
+
+# parse_description에서 모드별로 남길 description.md 섹션
+DESCRIPTION_SECTIONS = {
+    "code": frozenset(["Project Description", "Circuit Description", "Expected Behavior", "Success Criteria", "Notes for Implementation"]),
+    "hardware": frozenset(["Project Description", "Circuit Description", "Success Criteria", "Notes for Implementation", "Attributes"]),
+}
+DESCRIPTION_SECTIONS_ALL = frozenset(["Project Description", "Circuit Description", "Expected Behavior", "Success Criteria", "Notes for Implementation", "Attributes"])
+# "# 제목" 또는 "## 섹션" 줄
+DESCRIPTION_HEADING_RE = re.compile(r"^(#{1,2}) (.*)$", re.MULTILINE)
+
+# 이 환경 변수에 디렉토리를 지정하면 LLM 응답을 디스크에 캐시함 (기본: 사용 안 함)
+LLM_CACHE_DIR_ENV = "LLM_CACHE_DIR"
+LLM_CACHE_FILE_NAME = "llm_cache.sqlite3"
+# 병렬 실험 프로세스들이 같은 캐시 파일에 동시에 쓸 때 잠금 해제를 기다리는 최대 시간(초)
+LLM_CACHE_TIMEOUT = 30
+
+def loads_json(data):
+    """Parse JSON from bytes or str, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
 
 def load_project_files(project_path, file_types=None, diagram_mode="logical"):
     """
@@ -42,114 +102,213 @@ def load_project_files(project_path, file_types=None, diagram_mode="logical"):
 
     scenario_path = os.path.join(project_path, "scenario.yaml")
 
+    # 각 파일은 존재 여부를 따로 확인하지 않고 한 번에 읽은 뒤, 없으면 경고 후 기본값 사용
     # Load description.md if required
     if "description" in file_types:
-        description = ""
-        if os.path.exists(description_path):
-            with open(description_path, "r") as f:
-                description = f.read()
-        else:
+        try:
+            description = Path(description_path).read_text()
+        except FileNotFoundError:
             print(f"Warning: description.md not found at {description_path}")
+            description = ""
         result["description"] = description
 
     # Load main.ino if required
     if "code" in file_types:
-        code = ""
-        if os.path.exists(code_path):
-            with open(code_path, "r") as f:
-                code = f.read()
-        else:
+        try:
+            code = Path(code_path).read_text()
+        except FileNotFoundError:
             print(f"Warning: main.ino not found at {code_path}")
+            code = ""
         result["code"] = code
 
     # Load diagram.json if required
     if "diagram" in file_types:
-        diagram = {}
-        if os.path.exists(diagram_path):
-            with open(diagram_path, "r") as f:
-                diagram = json.load(f)
-        else:
+        try:
+            diagram = loads_json(Path(diagram_path).read_bytes())
+        except FileNotFoundError:
             print(f"Warning: diagram file not found at {diagram_path}")
+            diagram = {}
         result["diagram"] = diagram
         # Also store which diagram mode was actually used
         result["diagram_mode"] = diagram_mode
 
     # Load scenario.yaml if required
     if "scenario" in file_types:
-        scenario = {}
-        if os.path.exists(scenario_path):
-            with open(scenario_path, "r") as f:
-                scenario = yaml.safe_load(f)
-        else:
+        try:
+            scenario = yaml.load(Path(scenario_path).read_bytes(), Loader=YamlSafeLoader)
+        except FileNotFoundError:
             print(f"Warning: scenario.yaml not found at {scenario_path}")
+            scenario = {}
         result["scenario"] = scenario
 
     return result
 
-def generate_with_openai(prompt, model=None):
+class RateLimiter:
+    """
+    Sliding-window limiter for requests/tokens per minute with a concurrency cap.
+
+    Each limit is optional; None leaves that dimension unlimited. Requests rejected by the provider with a rate-limit error are removed from the
+    window, so retries are not throttled by the attempts that failed. The wait advised
+    by the provider (Retry-After) holds back every request to that provider, and is the
+    only backoff applied before a retry.
     """
-    Generate content using OpenAI API.
+
+    def __init__(self, rpm=None, tpm=None, max_concurrent=None, window=60.0):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.window = window
+        self.semaphore = threading.BoundedSemaphore(max_concurrent) if max_concurrent else None
+        self.lock = threading.Lock()
+        self.requests = deque()  # (timestamp, estimated_tokens)
+        self.resume_at = 0.0  # rate limit 응답 이후 다음 요청을 보낼 수 있는 시각 (time.monotonic 기준)
+
+    def acquire(self, estimated_tokens=0):
+        """
+        Blocks until a request with the given token estimate may be sent.
+
+        Returns:
+            The window entry of the request, to pass to on_rate_limited() if it is rejected
+        """
+        while True:
+            if self.semaphore is not None:
+                self.semaphore.acquire()
+            with self.lock:
+                now = time.monotonic()
+                if now < self.resume_at:
+                    # 제공자가 알려준 Retry-After 시각까지 대기
+                    wait = self.resume_at - now
+                else:
+                    while self.requests and now - self.requests[0][0] >= self.window:
+                        self.requests.popleft()
+                    used_tokens = sum(tokens for _, tokens in self.requests)
+                    within_rpm = self.rpm is None or len(self.requests) < self.rpm
+                    # 윈도우가 비어 있으면 토큰 추정치가 한도를 넘더라도 요청을 허용
+                    within_tpm = self.tpm is None or not self.requests or used_tokens + estimated_tokens <= self.tpm
+                    if within_rpm and within_tpm:
+                        entry = (now, estimated_tokens)
+                        self.requests.append(entry)
+                        return entry
+                    wait = self.window - (now - self.requests[0][0])
+            # 대기하는 동안 동시 요청 슬롯을 반납해, 보낼 수 있는 다른 요청이 막히지 않도록 함
+            self.release()
+            time.sleep(wait)
+
+    def release(self):
+        """Releases the concurrency slot taken by acquire()."""
+        if self.semaphore is not None:
+            self.semaphore.release()
+
+    def on_rate_limited(self, entry, retry_after):
+        """
+        Records a request rejected with a rate-limit error.
+
+        Args:
+            entry: The window entry returned by acquire() for the rejected request
+            retry_after: Seconds to hold back requests to this provider
+
+        Returns:
+            Seconds until requests to this provider may be sent again
+        """
+        with self.lock:
+            try:
+                self.requests.remove(entry)
+            except ValueError:
+                pass  # 이미 윈도우에서 만료됨
+            now = time.monotonic()
+            self.resume_at = max(self.resume_at, now + retry_after)
+            return self.resume_at - now
+
+_rate_limiters = {}
+_rate_limiters_lock = threading.Lock()
+
+def get_rate_limiter(llm_provider):
+    """
+    Get the shared rate limiter for an LLM provider.
 
     Args:
-        prompt: The prompt to send to the API
-        model: The model to use (default: from environment variable)
+        llm_provider: The HTTP API provider ("openai", "anthropic", "gemini")
 
     Returns:
-        Generated content as string, or None if error
+        RateLimiter instance shared by all calls to this provider in this process
     """
-    api_key = os.environ.get("OPENAI_API_KEY")
-    model = model or os.environ.get("OPENAI_MODEL", "gpt-4o")
+    with _rate_limiters_lock:
+        if llm_provider not in _rate_limiters:
+            _rate_limiters[llm_provider] = RateLimiter(**get_provider_rate_limits(llm_provider))
+        return _rate_limiters[llm_provider]
 
-    if not api_key:
-        print("Error: OpenAI API key not found in environment variables")
-        return None
+def get_provider_rate_limits(llm_provider):
+    """
+    Get the request limits for an HTTP API provider.
 
-    headers = {
-        "Content-Type": "application/json",
-        "Authorization": f"Bearer {api_key}"
-    }
+    Args:
+        llm_provider: The HTTP API provider ("openai", "anthropic", "gemini")
 
-    data = {
-        "model": model,
-        "messages": [{"role": "user", "content": prompt}],
-    }
+    Returns:
+        Dictionary with rpm, tpm and max_concurrent, taken from the <PROVIDER>_RPM,
+        <PROVIDER>_TPM and <PROVIDER>_MAX_CONCURRENT environment variables
+        (None if a variable is not set)
+    """
+    limits = dict.fromkeys(RATE_LIMIT_NAMES)
+    for limit_name in RATE_LIMIT_NAMES:
+        env_key = f"{llm_provider.upper()}_{limit_name.upper()}"
+        value = os.environ.get(env_key)
+        if not value:
+            continue
+        try:
+            limits[limit_name] = max(int(value), 1)
+        except ValueError:
+            print(f"Warning: Ignoring invalid {env_key}={value!r} (expected a positive integer)")
+    return limits
 
-    try:
-        response = requests.post(
-            "https://api.openai.com/v1/chat/completions",
-            headers=headers,
-            json=data
-        )
-        response.raise_for_status()
-        return response.json()['choices'][0]['message']['content']
+def get_llm_model(llm_provider):
+    """
+    Get the model configured for an LLM provider.
 
-    except Exception as e:
-        print(f"Error with OpenAI API: {e}")
-        if 'response' in locals() and hasattr(response, 'status_code') and response.status_code == 429:
-            print("Rate limit exceeded. Waiting 60 seconds before retrying...")
-            time.sleep(60)
-            print("Retrying generation with OpenAI API...")
-            return generate_with_openai(prompt, model)
-        return None
+    Args:
+        llm_provider: The LLM provider ("openai", "anthropic", "gemini", "ollama")
 
-def generate_with_anthropic(prompt, model=None):
+    Returns:
+        Model name from the provider's environment variable, or its default model
     """
-    Generate content using Anthropic API.
+    env_key, default_model = LLM_MODEL_DEFAULTS[llm_provider]
+    return os.environ.get(env_key, default_model)
+
+def estimate_tokens(text):
+    """Roughly estimate the number of tokens in a text (about 4 characters per token)."""
+    return len(text) // 4
+
+def get_retry_after(response, default=MAX_RATE_LIMIT_BACKOFF):
+    """
+    Get the wait time advised by a rate-limited response.
 
     Args:
-        prompt: The prompt to send to the API
-        model: The model to use (default: from environment variable)
+        response: The HTTP response with status 429
+        default: Wait time in seconds if the response has no usable Retry-After header
 
     Returns:
-        Generated content as string, or None if error
+        Wait time in seconds
     """
-    api_key = os.environ.get("ANTHROPIC_API_KEY")
-    model = model or os.environ.get("ANTHROPIC_MODEL", "claude-3-opus-20240229")
+    try:
+        return max(float(response.headers.get("Retry-After")), 0)
+    except (TypeError, ValueError):
+        return default
 
-    if not api_key:
-        print("Error: Anthropic API key not found in environment variables")
-        return None
+def build_openai_request(prompt, model, api_key):
+    """Build the (url, headers, data) of an OpenAI chat completions request."""
+    headers = {
+        "Content-Type": "application/json",
+        "Authorization": f"Bearer {api_key}"
+    }
 
+    data = {
+        "model": model,
+        "messages": [{"role": "user", "content": prompt}],
+    }
+
+    return "https://api.openai.com/v1/chat/completions", headers, data
+
+def build_anthropic_request(prompt, model, api_key):
+    """Build the (url, headers, data) of an Anthropic messages request."""
     headers = {
         "Content-Type": "application/json",
         "x-api-key": api_key,
@@ -162,42 +321,10 @@ def generate_with_anthropic(prompt, model=None):
         "max_tokens": 4000
     }
 
-    try:
-        response = requests.post(
-            "https://api.anthropic.com/v1/messages",
-            headers=headers,
-            json=data
-        )
-        response.raise_for_status()
-        return response.json()['content'][0]['text']
-
-    except Exception as e:
-        print(f"Error with Anthropic API: {e}")
-        if 'response' in locals() and hasattr(response, 'status_code') and response.status_code == 429:
-            print("Rate limit exceeded. Waiting 60 seconds before retrying...")
-            time.sleep(60)
-            print("Retrying generation with Anthropic API...")
-            return generate_with_anthropic(prompt, model)
-        return None
-
-def generate_with_gemini(prompt, model=None):
-    """
-    Generate content using Gemini API.
-
-    Args:
-        prompt: The prompt to send to the API
-        model: The model to use (default: from environment variable)
-
-    Returns:
-        Generated content as string, or None if error
-    """
-    api_key = os.environ.get("GEMINI_API_KEY")
-    model = model or os.environ.get("GEMINI_MODEL", "gemini-2.0-flash-lite")
-
-    if not api_key:
-        print("Error: Gemini API key not found in environment variables")
-        return None
+    return "https://api.anthropic.com/v1/messages", headers, data
 
+def build_gemini_request(prompt, model, api_key):
+    """Build the (url, headers, data) of a Gemini generateContent request."""
     headers = {
         "Content-Type": "application/json"
     }
@@ -214,24 +341,128 @@ def generate_with_gemini(prompt, model=None):
         }
     }
 
-    try:
-        response = requests.post(
-            f"https://generativelanguage.googleapis.com/v1beta/models/{model}:generateContent?key={api_key}",
-            headers=headers,
-            json=data
-        )
-        response.raise_for_status()
-        return response.json()['candidates'][0]['content']['parts'][0]['text']
+    return f"https://generativelanguage.googleapis.com/v1beta/models/{model}:generateContent?key={api_key}", headers, data
+
+# LLM API 호출 간 TCP/TLS 연결을 재사용하기 위한 공유 세션 (HTTP keep-alive)
+HTTP_SESSION = requests.Session()
+HTTP_SESSION.mount("https://", HTTPAdapter(pool_connections=16, pool_maxsize=32))
+
+# HTTP API 제공자별 요청 생성/응답 추출 방법
+LLM_API_PROFILES = {
+    "openai": {
+        "name": "OpenAI",
+        "api_key_env": "OPENAI_API_KEY",
+        "build_request": build_openai_request,
+        "extract_content": lambda response_data: response_data['choices'][0]['message']['content'],
+    },
+    "anthropic": {
+        "name": "Anthropic",
+        "api_key_env": "ANTHROPIC_API_KEY",
+        "build_request": build_anthropic_request,
+        "extract_content": lambda response_data: response_data['content'][0]['text'],
+    },
+    "gemini": {
+        "name": "Gemini",
+        "api_key_env": "GEMINI_API_KEY",
+        "build_request": build_gemini_request,
+        "extract_content": lambda response_data: response_data['candidates'][0]['content']['parts'][0]['text'],
+    },
+}
+
+def generate_with_api(llm_provider, prompt, model=None):
+    """
+    Generate content using an HTTP LLM API described in LLM_API_PROFILES.
 
-    except Exception as e:
-        print(f"Error with Gemini API: {e}")
-        if 'response' in locals() and hasattr(response, 'status_code') and response.status_code == 429:
-            print("Rate limit exceeded. Waiting 60 seconds before retrying...")
-            time.sleep(60)
-            print("Retrying generation with Gemini API...")
-            return generate_with_gemini(prompt, model)
+    Args:
+        llm_provider: The LLM provider ("openai", "anthropic", "gemini")
+        prompt: The prompt to send to the API
+        model: The model to use (default: from environment variable)
+
+    Returns:
+        Generated content as string, or None if error
+    """
+    profile = LLM_API_PROFILES[llm_provider]
+    api_key = os.environ.get(profile["api_key_env"])
+    model = model or get_llm_model(llm_provider)
+
+    if not api_key:
+        print(f"Error: {profile['name']} API key not found in environment variables")
         return None
 
+    url, headers, data = profile["build_request"](prompt, model, api_key)
+
+    rate_limiter = get_rate_limiter(llm_provider)
+    for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+        response = None
+        # 재시도 전 대기(Retry-After)도 limiter가 수행하므로, 백오프는 이 호출 한 곳에서만 발생
+        request_entry = rate_limiter.acquire(estimate_tokens(prompt))
+        if attempt:
+            print(f"Retrying generation with {profile['name']} API...")
+        try:
+            response = HTTP_SESSION.post(
+                url,
+                headers=headers,
+                json=data
+            )
+            response.raise_for_status()
+            return profile["extract_content"](loads_json(response.content))
+
+        except Exception as e:
+            print(f"Error with {profile['name']} API: {e}")
+            if response is None or response.status_code != 429:
+                return None
+            # 거절된 요청은 윈도우에서 제외하고, 같은 제공자의 요청을 Retry-After(없으면 지수 백오프) 동안 보류
+            retry_wait = rate_limiter.on_rate_limited(
+                request_entry, get_retry_after(response, default=min(2 ** attempt, MAX_RATE_LIMIT_BACKOFF))
+            )
+        finally:
+            rate_limiter.release()
+
+        if attempt < MAX_RATE_LIMIT_RETRIES:
+            print(f"Rate limit exceeded. Waiting {retry_wait:g} seconds before retrying...")
+
+    print(f"Error: {profile['name']} API rate limit still exceeded after {MAX_RATE_LIMIT_RETRIES} retries")
+    return None
+
+def generate_with_openai(prompt, model=None):
+    """
+    Generate content using OpenAI API.
+
+    Args:
+        prompt: The prompt to send to the API
+        model: The model to use (default: from environment variable)
+
+    Returns:
+        Generated content as string, or None if error
+    """
+    return generate_with_api("openai", prompt, model)
+
+def generate_with_anthropic(prompt, model=None):
+    """
+    Generate content using Anthropic API.
+
+    Args:
+        prompt: The prompt to send to the API
+        model: The model to use (default: from environment variable)
+
+    Returns:
+        Generated content as string, or None if error
+    """
+    return generate_with_api("anthropic", prompt, model)
+
+def generate_with_gemini(prompt, model=None):
+    """
+    Generate content using Gemini API.
+
+    Args:
+        prompt: The prompt to send to the API
+        model: The model to use (default: from environment variable)
+
+    Returns:
+        Generated content as string, or None if error
+    """
+    return generate_with_api("gemini", prompt, model)
+
 def generate_with_ollama(prompt, model=None, system_message=None):
     """
     Generate content using Ollama API via the official Python library.
@@ -250,7 +481,7 @@ def generate_with_ollama(prompt, model=None, system_message=None):
         print("Error: Ollama Python library not found. Please install it with 'pip install ollama'")
         return None
 
-    model = model or os.environ.get("OLLAMA_MODEL", "llama3")
+    model = model or get_llm_model("ollama")
     
     try:
         # If system message is provided, use chat API with messages format
@@ -313,6 +544,94 @@ def get_available_ollama_models():
             print("Visit https://ollama.ai/ for installation instructions.")
         return []
 
+class LLMResponseCache:
+    """
+    On-disk cache of LLM responses shared by concurrent experiment processes.
+
+    Backed by SQLite in WAL mode, which serialises writers across processes; the
+    connection is opened once per process and shared by its threads.
+    """
+
+    def __init__(self, path):
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, timeout=LLM_CACHE_TIMEOUT, isolation_level=None,
+                                          check_same_thread=False)
+        # WAL 전환은 다른 프로세스가 같은 파일을 여는 중이면 busy timeout 없이 바로 실패할 수 있어 재시도
+        deadline = time.monotonic() + LLM_CACHE_TIMEOUT
+        while True:
+            try:
+                self.connection.execute("PRAGMA journal_mode=WAL")
+                break
+            except sqlite3.OperationalError:
+                if time.monotonic() >= deadline:
+                    raise
+                time.sleep(0.05)
+        self.connection.execute("CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, response TEXT NOT NULL)")
+
+    def get(self, key):
+        """Returns the cached response for a key, or None if it is not cached."""
+        with self.lock:
+            row = self.connection.execute("SELECT response FROM responses WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set(self, key, response):
+        """Stores a response, replacing any previous one for the key."""
+        with self.lock:
+            self.connection.execute("INSERT OR REPLACE INTO responses (key, response) VALUES (?, ?)", (key, response))
+
+_llm_caches = {}
+_llm_caches_lock = threading.Lock()
+
+def get_llm_cache():
+    """
+    Get this process's LLM response cache.
+
+    Returns:
+        LLMResponseCache in the LLM_CACHE_DIR directory, or None if caching is disabled
+    """
+    cache_dir = os.environ.get(LLM_CACHE_DIR_ENV)
+    if not cache_dir:
+        return None
+
+    cache_path = os.path.join(os.path.expanduser(cache_dir), LLM_CACHE_FILE_NAME)
+    with _llm_caches_lock:
+        if cache_path not in _llm_caches:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            _llm_caches[cache_path] = LLMResponseCache(cache_path)
+        return _llm_caches[cache_path]
+
+def get_llm_cache_key(prompt, llm_provider):
+    """Cache key of a prompt for the provider's currently configured model."""
+    return hashlib.blake2b("\0".join((llm_provider, get_llm_model(llm_provider), prompt)).encode()).hexdigest()
+
+def cache_llm_response(func):
+    """
+    Cache the responses of an LLM generation function on disk.
+
+    The cache is only used when the LLM_CACHE_DIR environment variable is set.
+    Responses are keyed by (provider, model, prompt); errors (None) are not cached.
+    Pass force=True to bypass the cache lookup and refresh the stored response.
+    """
+    @functools.wraps(func)
+    def wrapper(prompt, llm_provider, force=False):
+        cache = get_llm_cache() if llm_provider in LLM_MODEL_DEFAULTS else None
+        if cache is None:
+            return func(prompt, llm_provider)
+
+        key = get_llm_cache_key(prompt, llm_provider)
+        if not force:
+            cached = cache.get(key)
+            if cached is not None:
+                return cached
+
+        result = func(prompt, llm_provider)
+        if result is not None:
+            cache.set(key, result)
+        return result
+
+    return wrapper
+
+@cache_llm_response
 def generate_with_llm(prompt, llm_provider):
     """
     Generate content using the specified LLM provider.
@@ -335,34 +654,35 @@ def generate_with_llm(prompt, llm_provider):
         return generate_with_ollama(prompt)
 
 def parse_description(description, mode="both"):
-    result = []
-    
-    if mode == "code":
-        selected_sections = ["Project Description", "Circuit Description", "Expected Behavior", "Success Criteria", "Notes for Implementation"]
-    elif mode == "hardware":
-        selected_sections = ["Project Description", "Circuit Description", "Success Criteria", "Notes for Implementation", "Attributes"]
-    else:
-        selected_sections = ["Project Description", "Circuit Description", "Expected Behavior", "Success Criteria", "Notes for Implementation", "Attributes"]
-    
+    selected_sections = DESCRIPTION_SECTIONS.get(mode, DESCRIPTION_SECTIONS_ALL)
+    # 남길 텍스트를 줄 단위 복사 없이 [start, end) 오프셋 구간으로만 모아 두고 마지막에 한 번 슬라이싱
+    # 인접한 구간은 하나로 합쳐지며, 각 구간의 끝은 마지막 줄의 줄바꿈 직전
+    spans = []
     selected = False
-    lines = description.splitlines()
-    
-    for line in lines:
-        if line.startswith("# "):
-            result.append(line)
+
+    headings = list(DESCRIPTION_HEADING_RE.finditer(description))
+    for i, heading in enumerate(headings):
+        is_title = len(heading.group(1)) == 1
+        if not is_title:
+            selected = heading.group(2).strip() in selected_sections
+
+        # "# " 제목 줄은 항상 포함
+        if not (is_title or selected):
             continue
-        
-        if line.startswith("## "):
-            heading = line[3:].strip()
-            if heading in selected_sections:
-                selected = True
-            else:
-                selected = False
-                
+
+        span_end = heading.end()
         if selected:
-            result.append(line)
-    
-    return "\n".join(result).strip()
+            # 제목 다음 줄부터 다음 제목 앞까지의 본문도 포함
+            body_end = headings[i + 1].start() if i + 1 < len(headings) else len(description)
+            if body_end > span_end + 1:
+                span_end = body_end - 1 if description[body_end - 1] == "\n" else body_end
+
+        if spans and spans[-1][1] + 1 == heading.start():
+            spans[-1][1] = span_end
+        else:
+            spans.append([heading.start(), span_end])
+
+    return "\n".join(description[start:end] for start, end in spans).strip()
 
 def get_manual_input(prompt, end_marker="END"):
     """
@@ -420,17 +740,13 @@ def get_backup_filename(base_path, prefix, model_name=None, llm_provider=None, m
     base_name = os.path.basename(base_path)
     _, ext = os.path.splitext(base_name)
 
-    # Create backup directory structure
+    # Backup directory structure: backup/[model]/<subdir>/[mode]
     backup_dir = os.path.join(project_dir, "backup")
-    if not os.path.exists(backup_dir):
-        os.makedirs(backup_dir)
 
-    # Create model directory (use model name if available, otherwise use LLM provider)
+    # Model directory (use model name if available, otherwise use LLM provider)
     model_dir = model_name.replace("-", "_") if model_name else llm_provider
     if model_dir:
         backup_dir = os.path.join(backup_dir, model_dir)
-        if not os.path.exists(backup_dir):
-            os.makedirs(backup_dir)
 
     # Determine subdirectory based on prefix
     if "code" in prefix or "main" in prefix:
@@ -441,15 +757,13 @@ def get_backup_filename(base_path, prefix, model_name=None, llm_provider=None, m
         subdir = "other"
 
     subdir_path = os.path.join(backup_dir, subdir)
-    if not os.path.exists(subdir_path):
-        os.makedirs(subdir_path)
 
     # Add mode directory if provided
     if mode:
-        mode_path = os.path.join(subdir_path, mode)
-        if not os.path.exists(mode_path):
-            os.makedirs(mode_path)
-        subdir_path = mode_path
+        subdir_path = os.path.join(subdir_path, mode)
+
+    # Create the whole directory chain at once
+    os.makedirs(subdir_path, exist_ok=True)
 
     # Add model name to filename if provided
     if model_name:
@@ -459,9 +773,48 @@ def get_backup_filename(base_path, prefix, model_name=None, llm_provider=None, m
 
     return os.path.join(subdir_path, f"{prefix}{model_suffix}{ext}.{timestamp}.bak")
 
+def drain_stream(stream, lines):
+    """Read a text stream line by line into lines (e.g. a bounded deque) until EOF, then close it."""
+    with stream:
+        for line in stream:
+            lines.append(line)
+
+def kill_process_tree(process):
+    """Kill a process started with start_new_session=True together with its children, then reap it."""
+    if process.poll() is not None:
+        return
+    try:
+        if hasattr(os, "killpg"):
+            # npm/tsx가 띄운 하위 node 프로세스도 출력 파이프를 잡고 있으므로 프로세스 그룹 전체를 종료
+            os.killpg(process.pid, signal.SIGKILL)
+        else:
+            process.kill()
+    except ProcessLookupError:
+        pass
+    process.wait()
+
+@functools.lru_cache(maxsize=None)
+def get_wokwi_cli_command(wokwi_dir):
+    """
+    Get the command prefix that starts wokwi-cli from its source directory.
+
+    Runs the 'npm start' script (tsx src/main.ts) directly with node so that each test
+    does not pay for an extra npm process; falls back to 'npm start --' if tsx is not installed.
+
+    Args:
+        wokwi_dir: Path to the wokwi-cli directory
+
+    Returns:
+        List of command arguments to which the wokwi-cli options are appended
+    """
+    tsx_cli = os.path.join("node_modules", "tsx", "dist", "cli.mjs")
+    if os.path.isfile(os.path.join(wokwi_dir, tsx_cli)):
+        return ["node", tsx_cli, os.path.join("src", "main.ts")]
+    return ["npm", "start", "--"]
+
 def run_wokwi_tests(project_path):
     """
-    Run tests using wokwi-cli via npm start, passing the project path as an argument.
+    Run tests using wokwi-cli (tsx src/main.ts, as run by npm start), passing the project path as an argument.
 
     Args:
         project_path: Path to the project directory containing diagram.json and scenario.yaml
@@ -504,46 +857,73 @@ def run_wokwi_tests(project_path):
                 timeout_ms = duration
                 break
 
-        # Construct the command: npm start -- --diagram-file diagram.json --scenario scenario.yaml <abs_project_path> --timeout <timeout>
+        # Construct the command: node <tsx> src/main.ts --diagram-file diagram.json --scenario scenario.yaml <abs_project_path> --timeout <timeout>
         command = [
-            "npm", "start", "--",
+            *get_wokwi_cli_command(wokwi_dir),
             "--diagram-file", "diagram.json",
             "--scenario", "scenario.yaml",
             abs_project_path,
             "--timeout", str(timeout_ms)
         ]
 
-        # Run wokwi-cli test using 'npm start --' from the wokwi_dir
-        result = subprocess.run(
+        # Run wokwi-cli test from the wokwi_dir
+        process = subprocess.Popen(
             command,
-            capture_output=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
             text=True,
-            cwd=wokwi_dir # Execute from the wokwi-cli directory
+            bufsize=1,
+            cwd=wokwi_dir, # Execute from the wokwi-cli directory
+            start_new_session=True # 오류 시 하위 프로세스까지 함께 종료할 수 있도록 별도 프로세스 그룹으로 실행
         )
 
-        return result.returncode == 0, result.stdout, result.stderr
+        # 출력이 매우 긴 경우에도 메모리 사용량이 제한되도록 stdout/stderr를 각각 스레드에서 읽으며 마지막 줄들만 보관
+        stdout_lines = deque(maxlen=WOKWI_OUTPUT_MAX_LINES)
+        stderr_lines = deque(maxlen=WOKWI_OUTPUT_MAX_LINES)
+        readers = []
+        try:
+            for stream, lines in ((process.stdout, stdout_lines), (process.stderr, stderr_lines)):
+                reader = threading.Thread(target=drain_stream, args=(stream, lines))
+                reader.start()
+                readers.append(reader)
+            returncode = process.wait()
+        finally:
+            # 예외(KeyboardInterrupt 포함)로 빠져나오더라도 wokwi-cli/node 프로세스를 남기지 않음
+            kill_process_tree(process)
+            for reader in readers:
+                reader.join()
+
+        return returncode == 0, "".join(stdout_lines), "".join(stderr_lines)
     except Exception as e:
         print(f"Error during testing: {e}")
         # Ensure stderr reflects the exception if subprocess didn't run
         stderr_output = ""
-        if 'result' in locals() and hasattr(result, 'stderr'):
-            stderr_output = result.stderr
+        if 'stderr_lines' in locals():
+            stderr_output = "".join(stderr_lines)
         return False, "", f"{str(e)}\n{stderr_output}".strip()
 
 def load_test_values(wokwi_diagram, project_path):
     with open(os.path.join(project_path, "scenario.yaml")) as f:
-        scenario = yaml.safe_load(f)
+        scenario = yaml.load(f, Loader=YamlSafeLoader)
     
     if "test-values" in scenario:
         print("Loading test values from scenario file...")
+        # 부품을 type/id 별로 한 번만 색인해 두고 각 test value는 해당 부품에만 적용
+        parts_by_type = defaultdict(list)
+        parts_by_id = defaultdict(list)
+        for part in wokwi_diagram["parts"]:
+            parts_by_type[part.get("type")].append(part)
+            parts_by_id[part.get("id")].append(part)
+
         for test_value in scenario["test-values"]:
-            for part in wokwi_diagram["parts"]:
-                if "part-type" in test_value:
-                    if part["type"] == test_value["part-type"]:
-                        part["attrs"][test_value["attr-name"]] = test_value["value"]
-                elif "part-id" in test_value:
-                    if part["id"] == test_value["part-id"]:
-                        part["attrs"][test_value["attr-name"]] = test_value["value"]
+            if "part-type" in test_value:
+                target_parts = parts_by_type.get(test_value["part-type"], ())
+            elif "part-id" in test_value:
+                target_parts = parts_by_id.get(test_value["part-id"], ())
+            else:
+                continue
+            for part in target_parts:
+                part["attrs"][test_value["attr-name"]] = test_value["value"]
         
     return wokwi_diagram
 
@@ -594,24 +974,8 @@ def create_logger(logs=None):
 
     return log_message, logs
 
-def generate_improvement_prompt(original_prompt, iteration, previous_generation, include_previous_results=False, previous_results=None, previous_error=None):
-    """
-    Generate a prompt for improving previous generation based on results.
-    
-    Args:
-        original_prompt: Original prompt used for first generation
-        iteration: Current iteration number
-        previous_generation: Previous generated content (code or hardware)
-        include_previous_results: Whether to include previous results details
-        previous_results: Previous simulation/evaluation results
-        previous_error: Previous error message
-        
-    Returns:
-        An improvement prompt string
-    """
-    
-    # 기본 개선 프롬프트 (previous_results를 포함하지 않는 경우)
-    improvement_template = """
+# 기본 개선 프롬프트 (previous_results를 포함하지 않는 경우)
+IMPROVEMENT_TEMPLATE = """
 # Arduino {type} Self-Improvement Task (Iteration {iteration})
 
 ## Original Task
@@ -628,8 +992,8 @@ Ensure your improved {type} follows all formatting requirements from the origina
 {output_format_reminder}
 """
 
-    # previous_results를 포함하는 개선 프롬프트
-    improvement_template_with_results = """
+# previous_results를 포함하는 개선 프롬프트
+IMPROVEMENT_TEMPLATE_WITH_RESULTS = """
 # Arduino {type} Self-Improvement Task (Iteration {iteration})
 
 ## Original Task
@@ -652,28 +1016,75 @@ Ensure your improved {type} follows all formatting requirements from the origina
 {output_format_reminder}
 """
 
-    type_name = "Code" if "Code Generation" in original_prompt else "Hardware Design"
-    
-    # 출력 형식 요구사항 추출 (원본 프롬프트에서 형식 요구사항 부분 보존)
-    output_format_reminder = ""
+def compile_template(template):
+    """Split a str.format template once into (literal text, field name) pairs."""
+    return tuple((literal, field_name) for literal, field_name, _, _ in string.Formatter().parse(template))
+
+def render_template(compiled_template, **values):
+    """Fill a template compiled by compile_template; equivalent to template.format(**values)."""
+    return "".join(
+        literal + (format(values[field_name]) if field_name is not None else "")
+        for literal, field_name in compiled_template
+    )
+
+# 개선 프롬프트 템플릿은 모듈 로드 시 한 번만 분해해 두고 호출마다 재파싱하지 않음
+COMPILED_IMPROVEMENT_TEMPLATE = compile_template(IMPROVEMENT_TEMPLATE)
+COMPILED_IMPROVEMENT_TEMPLATE_WITH_RESULTS = compile_template(IMPROVEMENT_TEMPLATE_WITH_RESULTS)
+
+@functools.lru_cache(maxsize=256)
+def get_output_format_reminder(original_prompt):
+    """
+    Extract the output format requirements of the original prompt as a reminder section.
+
+    The original prompt stays the same across self-improvement iterations, so the
+    result is cached.
+
+    Args:
+        original_prompt: Original prompt used for first generation
+
+    Returns:
+        Output format reminder string
+    """
     try:
         if "## Output Format" in original_prompt:
             output_format_section = original_prompt.split("## Output Format")[1].split("##")[0]
-            output_format_reminder = f"\n## Output Format Reminder\n{output_format_section.strip()}"
+            return f"\n## Output Format Reminder\n{output_format_section.strip()}"
         elif "### Output Format" in original_prompt:
             output_format_section = original_prompt.split("### Output Format")[1].split("##")[0]
-            output_format_reminder = f"\n### Output Format Reminder\n{output_format_section.strip()}"
+            return f"\n### Output Format Reminder\n{output_format_section.strip()}"
         else:
-            output_format_reminder = "\nPlease follow the output format specified in the original prompt."
+            return "\nPlease follow the output format specified in the original prompt."
     except Exception:
-        output_format_reminder = "\nPlease follow the output format specified in the original prompt."
+        return "\nPlease follow the output format specified in the original prompt."
+
+def generate_improvement_prompt(original_prompt, iteration, previous_generation, include_previous_results=False, previous_results=None, previous_error=None):
+    """
+    Generate a prompt for improving previous generation based on results.
+    
+    Args:
+        original_prompt: Original prompt used for first generation
+        iteration: Current iteration number
+        previous_generation: Previous generated content (code or hardware)
+        include_previous_results: Whether to include previous results details
+        previous_results: Previous simulation/evaluation results
+        previous_error: Previous error message
+        
+    Returns:
+        An improvement prompt string
+    """
+    
+    type_name = "Code" if "Code Generation" in original_prompt else "Hardware Design"
+    
+    # 출력 형식 요구사항 추출 (원본 프롬프트에서 형식 요구사항 부분 보존)
+    output_format_reminder = get_output_format_reminder(original_prompt)
     
     if include_previous_results and previous_results:
         error_details = f"\n### Error Details\n{previous_error}" if previous_error else ""
         compile_status = "Success" if previous_results.get("compile_result", False) else "Failed"
         test_status = "Success" if previous_results.get("test_result", False) else "Failed"
         
-        return improvement_template_with_results.format(
+        return render_template(
+            COMPILED_IMPROVEMENT_TEMPLATE_WITH_RESULTS,
             type=type_name,
             iteration=iteration,
             original_prompt=original_prompt,
@@ -684,7 +1095,8 @@ Ensure your improved {type} follows all formatting requirements from the origina
             output_format_reminder=output_format_reminder
         )
     else:
-        return improvement_template.format(
+        return render_template(
+            COMPILED_IMPROVEMENT_TEMPLATE,
             type=type_name,
             iteration=iteration,
             original_prompt=original_prompt,
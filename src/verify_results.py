@@ -2,7 +2,11 @@
 # -*- coding: utf-8 -*-
 
 import os
+import re
+import sys
 import json
+import argparse
+from concurrent.futures import ThreadPoolExecutor
 
 # PROVIDED PROJECTS LIST 
 PROJECTS_WITH_LEVEL = [
@@ -61,26 +65,195 @@ PROJECTS_WITH_LEVEL = [
 EXPERIMENTS_BASE_DIR = "experiments"
 EXPECTED_FILES_PER_PROJECT = 5 
 # Directories to ignore within EXPERIMENTS_BASE_DIR when looking for model directories
-IGNORE_DIRS = ["summary", "plots"] 
+IGNORE_DIRS = frozenset(("summary", "plots"))
+# result 파일명 패턴 (results_*.json) - startswith/endswith 두 번 대신 한 번의 매칭으로 판별
+# 프로젝트 디렉토리는 bytes 경로로 스캔하므로 (파일명 디코딩 생략) 패턴도 bytes로 컴파일
+RESULT_FILE_RE = re.compile(rb"results_.*\.json\Z", re.DOTALL)
+# 프로젝트 디렉토리 mtime 기반 result 파일 수 캐시 (--cache 옵션 사용 시)
+VERIFY_CACHE_FILE = os.path.join(EXPERIMENTS_BASE_DIR, ".verify_cache.json")
+# 모델 디렉토리 검증에 사용할 최대 스레드 수 (디렉토리 탐색은 I/O 대기 위주)
+MAX_VERIFY_WORKERS = 32
 
 def get_clean_project_names(projects_with_level_list):
     """Extracts project names by stripping the 'levelX/' prefix."""
     cleaned_names = []
     for project_path in projects_with_level_list:
-        if '/' in project_path:
-            cleaned_names.append(project_path.split('/', 1)[1])
-        else:
+        # partition은 구분자 검색과 분리를 한 번에 처리 (별도의 '/' in 검사 불필요)
+        _, sep, project_name = project_path.partition('/')
+        if not sep:
             # In case a project name doesn't have the level prefix for some reason
-            cleaned_names.append(project_path)
+            project_name = project_path
             print(f"Warning: Project '{project_path}' does not seem to have a level prefix.")
+        cleaned_names.append(project_name)
     return cleaned_names
 
-def verify_experiment_results():
+def load_verify_cache(cache_file):
+    """Loads the {project_path: [mtime_ns, file_count]} cache, or an empty dict if unavailable."""
+    try:
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return cache if isinstance(cache, dict) else {}
+
+def save_verify_cache(cache_file, cache):
+    """Saves the result file count cache next to the experiment results."""
+    try:
+        with open(cache_file, 'w', encoding='utf-8') as f:
+            json.dump(cache, f)
+    except OSError as e:
+        print(f"Warning: Could not save verification cache '{cache_file}': {e}")
+
+class ModelReport:
+    """Result file counts collected for a single model directory."""
+
+    __slots__ = ("model_name", "total_files", "projects_with_missing_files", "notices")
+
+    def __init__(self, model_name):
+        self.model_name = model_name
+        self.total_files = 0
+        self.projects_with_missing_files = {} # {project_name: actual_file_count}
+        self.notices = [] # messages produced while scanning, in project order
+
+    def add_project(self, project_name, file_count):
+        """Accumulates a counted project and records it if its file count is unexpected."""
+        self.total_files += file_count
+        if file_count != EXPECTED_FILES_PER_PROJECT:
+            self.projects_with_missing_files[project_name] = file_count
+
+def _verify_one_model(model_name, model_path, project_names, previous_cache=None, current_cache=None):
+    """
+    Counts result files for every project of a single model.
+
+    If previous_cache is given, a project directory whose mtime matches its cached entry
+    reuses the cached count instead of being scanned. Counts are recorded in current_cache.
+
+    Returns:
+        ModelReport for the model
+    """
+    report = ModelReport(model_name)
+    notices = report.notices
+    projects_with_missing_files = report.projects_with_missing_files
+    # 프로젝트 루프에서 반복 호출되는 전역/속성 조회를 지역 변수로 미리 바인딩
+    is_result_file = RESULT_FILE_RE.match
+    add_project = report.add_project
+    scandir = os.scandir
+    fsencode = os.fsencode
+
+    # 프로젝트마다 isdir을 호출하는 대신 모델 디렉토리를 한 번만 스캔해 존재하는 프로젝트 디렉토리를 수집
+    try:
+        with os.scandir(model_path) as entries:
+            present_projects = {entry.name: entry for entry in entries if entry.is_dir()}
+    except OSError:
+        present_projects = {}
+    # 누락된 프로젝트 디렉토리는 집합 차연산으로 한 번에 구함 (출력은 프로젝트 목록 순서 유지)
+    missing_projects = set(project_names).difference(present_projects)
+
+    for project_name in project_names:
+        project_file_count = 0
+
+        if project_name in missing_projects:
+            notices.append(f"  알림: 모델 '{model_name}'에 대한 프로젝트 디렉토리 '{project_name}' 없음.")
+            projects_with_missing_files[project_name] = 0 # Mark as 0 files if dir missing
+            continue # Skip to next project if project directory doesn't exist
+
+        project_entry = present_projects[project_name]
+        project_path = project_entry.path
+        # 파일 추가/삭제/이름 변경은 프로젝트 디렉토리의 mtime을 갱신하므로, mtime이 같으면 캐시된 개수를 재사용
+        mtime_ns = None
+        if current_cache is not None:
+            try:
+                mtime_ns = project_entry.stat().st_mtime_ns
+            except OSError:
+                pass
+        cached = previous_cache.get(project_path) if previous_cache else None
+
+        # 디렉토리 내의 모든 result_*.json 파일 수를 직접 카운트
+        try:
+            if mtime_ns is not None and cached and cached[0] == mtime_ns:
+                project_file_count = cached[1]
+            else:
+                # 파일명 패턴으로 먼저 거르고, 하위 디렉토리 제외는 추가 stat 없는 DirEntry.is_file()로 처리
+                # (일반 파일은 d_type만으로 판별되고, 심볼릭 링크로 연결된 result 파일만 대상 확인을 위해 stat 수행)
+                with scandir(fsencode(project_path)) as entries:
+                    project_file_count = sum(
+                        1 for entry in entries
+                        if is_result_file(entry.name) and entry.is_file()
+                    )
+        except OSError as e:
+            notices.append(f"  [오류] 프로젝트 디렉토리 '{project_path}' 접근 중 오류 발생: {e}")
+            projects_with_missing_files[project_name] = -1 # Indicate error
+            continue
+
+        if mtime_ns is not None:
+            current_cache[project_path] = [mtime_ns, project_file_count]
+
+        add_project(project_name, project_file_count)
+
+    return report
+
+def format_model_report(report, expected_total_files, verbose=False):
+    """
+    Formats the verification report block of a single model.
+
+    The per-project detail rows are only formatted when verbose is set; otherwise
+    a single line with the number of affected projects is emitted.
+
+    Returns:
+        Tuple of (model_ok, report_text)
+    """
+    model_name = report.model_name
+    total_files = report.total_files
+    projects_with_missing_files = report.projects_with_missing_files
+
+    # 예상 대비 차이를 한 번만 계산하고, 상태에 따라 헤더 한 줄만 선택
+    diff_files = expected_total_files - total_files
+    if diff_files:
+        status_msg = f"{abs(diff_files)}개 {'누락' if diff_files > 0 else '초과'}"
+
+    if projects_with_missing_files:
+        # 총 파일 수도 다른지, 아니면 총 파일 수는 맞는데 (예: A=4, B=6 -> 총합 10) 개별 프로젝트 파일 수가 틀린지 구분
+        if diff_files:
+            status_line = f"  [경고] 모델 '{model_name}'의 총 result 파일 수가 예상과 다릅니다. ({status_msg})"
+        else:
+            status_line = f"  [경고] 모델 '{model_name}'의 총 result 파일 수는 정상이지만, 일부 프로젝트의 파일 수가 올바르지 않습니다."
+    elif diff_files:
+        # 모든 프로젝트가 예상 개수를 가지면 총합도 맞아야 하므로 거의 발생하지 않아야 하지만, 방어적으로 로깅
+        status_line = f"  [오류] 모델 '{model_name}': 모든 프로젝트가 각 {EXPECTED_FILES_PER_PROJECT}개의 파일을 가진 것으로 보이나, 총 파일 수가 예상과 다릅니다 ({status_msg}). 내부 로직 확인 필요."
+    else:
+        status_line = f"  [성공] 모델 '{model_name}'은(는) 모든 예상 result 파일을 가지고 있으며, 각 프로젝트별 파일 수도 정확합니다."
+
+    lines = [
+        f"모델 검증 중: {model_name}",
+        *report.notices,
+        f"  모델 '{model_name}'의 총 result 파일 수: {total_files}/{expected_total_files}",
+        status_line,
+    ]
+    if projects_with_missing_files and not verbose:
+        lines.append(f"    파일 수가 올바르지 않은 프로젝트: {len(projects_with_missing_files)}개 (--verbose 옵션으로 상세 확인)")
+    elif projects_with_missing_files:
+        # 프로젝트 목록 순서(레벨 순)로 삽입되었으며, count != EXPECTED_FILES_PER_PROJECT 인 것들만 들어있음
+        lines.append("    프로젝트별 파일 수 상세:")
+        lines.extend(
+            f"      - 프로젝트 '{proj}': {count}/{EXPECTED_FILES_PER_PROJECT} 개의 파일 존재"
+            for proj, count in projects_with_missing_files.items()
+        )
+    lines.append("-" * 30)
+
+    model_ok = not projects_with_missing_files and not diff_files
+    return model_ok, "\n".join(lines) + "\n"
+
+def verify_experiment_results(use_cache=False, verbose=False):
     """
     Verifies that each model has the expected number of result files for all projects.
     Outputs details for models that do not meet the expectation.
+
+    Args:
+        use_cache: Reuse file counts of project directories unchanged since the last run
+        verbose: Print the per-project file counts of models that fail verification
     """
-    project_names = get_clean_project_names(PROJECTS_WITH_LEVEL)
+    # 모든 모델에서 반복 순회하므로 불변 튜플로 한 번만 생성
+    project_names = tuple(get_clean_project_names(PROJECTS_WITH_LEVEL))
     if not project_names:
         print("오류: 프로젝트 이름을 추출할 수 없습니다. PROJECTS_WITH_LEVEL 리스트를 확인하세요.")
         return
@@ -96,78 +269,37 @@ def verify_experiment_results():
         print(f"오류: '{EXPERIMENTS_BASE_DIR}' 디렉토리를 찾을 수 없습니다. 스크립트 위치를 확인하세요.")
         return
 
-    model_dirs = [d for d in os.listdir(EXPERIMENTS_BASE_DIR) 
-                  if os.path.isdir(os.path.join(EXPERIMENTS_BASE_DIR, d)) and d not in IGNORE_DIRS]
+    # scandir의 DirEntry는 디렉토리 스트림의 타입 정보를 재사용하므로 항목별 stat 호출이 필요 없음
+    # 모델 경로(entry.path)도 함께 보관해 모델별 검증에서 다시 조합하지 않음
+    with os.scandir(EXPERIMENTS_BASE_DIR) as entries:
+        model_dirs = [(entry.name, entry.path) for entry in entries
+                      if entry.is_dir() and entry.name not in IGNORE_DIRS]
 
     if not model_dirs:
         print(f"오류: '{EXPERIMENTS_BASE_DIR}' 디렉토리 내에서 모델 디렉토리를 찾을 수 없습니다.")
         return
 
-    all_models_ok = True
-    for model_name in sorted(model_dirs):
-        print(f"모델 검증 중: {model_name}")
-        current_model_total_files = 0
-        projects_with_missing_files = {} # {project_name: actual_file_count}
+    # 캐시 사용 시 이전 실행 결과를 읽고, 이번 실행에서 확인한 항목만 새로 저장 (삭제된 디렉토리 항목은 자연히 제거)
+    previous_cache = load_verify_cache(VERIFY_CACHE_FILE) if use_cache else None
+    current_cache = {} if use_cache else None
 
-        for project_name in project_names:
-            project_file_count = 0
-            project_path = os.path.join(EXPERIMENTS_BASE_DIR, model_name, project_name)
+    all_models_ok = True
+    # 모델별 디렉토리 탐색은 서로 독립적이므로 병렬로 수행하고, 출력은 정렬된 모델 순서대로 직렬 처리
+    # (current_cache의 키는 모델별 프로젝트 경로라 스레드 간에 겹치지 않음)
+    with ThreadPoolExecutor(max_workers=min(MAX_VERIFY_WORKERS, len(model_dirs))) as executor:
+        results = list(executor.map(
+            lambda model_dir: _verify_one_model(*model_dir, project_names, previous_cache, current_cache),
+            sorted(model_dirs)
+        ))
 
-            if not os.path.isdir(project_path):
-                print(f"  알림: 모델 '{model_name}'에 대한 프로젝트 디렉토리 '{project_name}' 없음.")
-                projects_with_missing_files[project_name] = 0 # Mark as 0 files if dir missing
-                continue # Skip to next project if project directory doesn't exist
+    if use_cache:
+        save_verify_cache(VERIFY_CACHE_FILE, current_cache)
 
-            # 디렉토리 내의 모든 result_*.json 파일 수를 직접 카운트
-            try:
-                actual_files_in_project = [
-                    f for f in os.listdir(project_path)
-                    if f.startswith("results_") and f.endswith(".json") and \
-                       os.path.isfile(os.path.join(project_path, f))
-                ]
-                project_file_count = len(actual_files_in_project)
-            except OSError as e:
-                print(f"  [오류] 프로젝트 디렉토리 '{project_path}' 접근 중 오류 발생: {e}")
-                projects_with_missing_files[project_name] = -1 # Indicate error
-                continue
-            
-            current_model_total_files += project_file_count
-            if project_file_count != EXPECTED_FILES_PER_PROJECT:
-                projects_with_missing_files[project_name] = project_file_count
-        
-        print(f"  모델 '{model_name}'의 총 result 파일 수: {current_model_total_files}/{expected_total_files_per_model}")
-
-        # 프로젝트별 파일 수에 문제가 있는지 먼저 확인
-        if projects_with_missing_files: 
-            all_models_ok = False
-            # 총 파일 수도 다른지, 아니면 총 파일 수는 맞는데 내부적으로 틀린지 구분
-            if current_model_total_files != expected_total_files_per_model:
-                diff_files = expected_total_files_per_model - current_model_total_files
-                status_msg = f"{abs(diff_files)}개 {'누락' if diff_files > 0 else '초과'}"
-                print(f"  [경고] 모델 '{model_name}'의 총 result 파일 수가 예상과 다릅니다. ({status_msg})")
-            else:
-                # 이 경우는 총 파일 수는 맞지만 (예: A=4, B=6 -> 총합 10), 개별 프로젝트 파일 수가 문제인 경우.
-                print(f"  [경고] 모델 '{model_name}'의 총 result 파일 수는 정상이지만, 일부 프로젝트의 파일 수가 올바르지 않습니다.")
-            
-            print(f"    프로젝트별 파일 수 상세:")
-            for proj, count in sorted(projects_with_missing_files.items()):
-                 # projects_with_missing_files에는 이미 count != EXPECTED_FILES_PER_PROJECT 인 것들만 들어있음.
-                 print(f"      - 프로젝트 '{proj}': {count}/{EXPECTED_FILES_PER_PROJECT} 개의 파일 존재")
-        
-        # projects_with_missing_files가 비어있을 때 (모든 프로젝트가 5개 파일 가짐)
-        # 이 경우, current_model_total_files는 expected_total_files_per_model와 같아야 정상
-        elif current_model_total_files != expected_total_files_per_model:
-            # 이 경우는 거의 발생하지 않아야 하지만, 방어적으로 로깅
-            all_models_ok = False
-            diff_files = expected_total_files_per_model - current_model_total_files
-            status_msg = f"{abs(diff_files)}개 {'누락' if diff_files > 0 else '초과'}"
-            print(f"  [오류] 모델 '{model_name}': 모든 프로젝트가 각 {EXPECTED_FILES_PER_PROJECT}개의 파일을 가진 것으로 보이나, 총 파일 수가 예상과 다릅니다 ({status_msg}). 내부 로직 확인 필요.")
-        
-        # projects_with_missing_files도 비어있고, 총 파일 수도 맞는 완벽한 경우
-        else:
-            print(f"  [성공] 모델 '{model_name}'은(는) 모든 예상 result 파일을 가지고 있으며, 각 프로젝트별 파일 수도 정확합니다.")
-        
-        print("-" * 30)
+    for report in results:
+        model_ok, report_text = format_model_report(report, expected_total_files_per_model, verbose)
+        all_models_ok = all_models_ok and model_ok
+        # 모델별 출력은 한 번에 기록 (print 호출마다 stdout 잠금/flush 반복 방지)
+        sys.stdout.write(report_text)
 
     if all_models_ok:
         print("\n모든 검증된 모델이 예상된 수의 result 파일을 가지고 있습니다.")
@@ -175,4 +307,11 @@ def verify_experiment_results():
         print("\n일부 모델에서 누락된 result 파일이 발견되었습니다. 위 로그를 확인하세요.")
 
 if __name__ == "__main__":
-    verify_experiment_results() 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Verify that every model has the expected number of result files")
+    parser.add_argument("--cache", action="store_true",
+                        help=f"Reuse file counts of project directories whose mtime is unchanged (stored in {VERIFY_CACHE_FILE})")
+    parser.add_argument("--verbose", action="store_true",
+                        help="Print per-project file counts for models that fail verification")
+    args = parser.parse_args()
+
+    verify_experiment_results(use_cache=args.cache, verbose=args.verbose) 
\ No newline at end of file
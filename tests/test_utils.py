@@ -0,0 +1,219 @@
+import os
+import sys
+import time
+
+import pytest
+
+pytest.importorskip("requests")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import requests
+import utils
+
+
+class FakeClock:
+    """Replaces time.monotonic/time.sleep so waits are recorded instead of slept."""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class FakeResponse:
+    def __init__(self, status_code, headers=None, content=b"{}"):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.content = content
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} Error")
+
+
+OPENAI_SUCCESS = FakeResponse(200, content=b'{"choices": [{"message": {"content": "ok"}}]}')
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake_clock = FakeClock()
+    monkeypatch.setattr(utils.time, "monotonic", fake_clock.monotonic)
+    monkeypatch.setattr(utils.time, "sleep", fake_clock.sleep)
+    return fake_clock
+
+
+def use_responses(monkeypatch, responses):
+    """Makes the shared HTTP session answer with the given responses in order."""
+    responses = iter(responses)
+    calls = []
+
+    def post(url, headers=None, json=None):
+        calls.append(url)
+        return next(responses)
+
+    monkeypatch.setattr(utils.HTTP_SESSION, "post", post)
+    return calls
+
+
+def use_rate_limiter(monkeypatch, llm_provider, rate_limiter):
+    monkeypatch.setitem(utils._rate_limiters, llm_provider, rate_limiter)
+
+
+def test_consecutive_rate_limits_wait_only_retry_after(monkeypatch, clock):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    # rpm=2: 거절된 요청이 윈도우에 남으면 세 번째 시도부터 60초 윈도우 대기가 발생함
+    use_rate_limiter(monkeypatch, "openai", utils.RateLimiter(rpm=2, tpm=10 ** 9, max_concurrent=1))
+    calls = use_responses(monkeypatch, [FakeResponse(429, {"Retry-After": "2"})] * 4 + [OPENAI_SUCCESS])
+
+    assert utils.generate_with_openai("prompt") == "ok"
+    assert len(calls) == 5
+    assert sum(clock.sleeps) == 8
+
+
+def test_zero_retry_after_does_not_stall(monkeypatch, clock):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    use_rate_limiter(monkeypatch, "openai", utils.RateLimiter(rpm=1, tpm=10 ** 9, max_concurrent=1))
+    calls = use_responses(monkeypatch, [FakeResponse(429, {"Retry-After": "0"})] * 5 + [OPENAI_SUCCESS])
+
+    assert utils.generate_with_openai("prompt") == "ok"
+    assert len(calls) == 6
+    assert sum(clock.sleeps) == 0
+
+
+def test_provider_rate_limits_from_environment(monkeypatch):
+    monkeypatch.setenv("ANTHROPIC_RPM", "7")
+    monkeypatch.setenv("ANTHROPIC_MAX_CONCURRENT", "not-a-number")
+    monkeypatch.delenv("ANTHROPIC_TPM", raising=False)
+
+    limits = utils.get_provider_rate_limits("anthropic")
+
+    # 설정하지 않았거나 잘못된 한도는 적용하지 않음
+    assert limits == {"rpm": 7, "tpm": None, "max_concurrent": None}
+
+
+def test_rate_limiter_frees_concurrency_slot_while_waiting(monkeypatch, clock):
+    rate_limiter = utils.RateLimiter(rpm=1, max_concurrent=1)
+    rate_limiter.acquire()
+    rate_limiter.release()
+    slot_free_while_sleeping = []
+
+    def sleep(seconds):
+        # 윈도우 대기 중에도 다른 요청이 동시 요청 슬롯을 잡을 수 있어야 함
+        slot_free_while_sleeping.append(rate_limiter.semaphore.acquire(blocking=False))
+        rate_limiter.semaphore.release()
+        clock.sleep(seconds)
+
+    monkeypatch.setattr(utils.time, "sleep", sleep)
+
+    rate_limiter.acquire()
+    assert slot_free_while_sleeping == [True]
+    assert clock.sleeps == [60]
+
+
+def test_rate_limit_retry_sleeps_exactly_retry_after(monkeypatch, clock, capsys):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    use_rate_limiter(monkeypatch, "openai", utils.RateLimiter(rpm=60, tpm=10 ** 9, max_concurrent=1))
+    calls = use_responses(monkeypatch, [FakeResponse(429, {"Retry-After": "3"}), OPENAI_SUCCESS])
+
+    assert utils.generate_with_openai("prompt") == "ok"
+    assert len(calls) == 2
+    assert clock.sleeps == [3]
+    assert "Waiting 3 seconds" in capsys.readouterr().out
+
+
+def test_rate_limit_retry_without_retry_after_uses_exponential_backoff(monkeypatch, clock, capsys):
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "test-key")
+    use_rate_limiter(monkeypatch, "anthropic", utils.RateLimiter(rpm=60, tpm=10 ** 9, max_concurrent=1))
+    success = FakeResponse(200, content=b'{"content": [{"text": "ok"}]}')
+    calls = use_responses(monkeypatch, [FakeResponse(429), FakeResponse(429), FakeResponse(429), success])
+
+    assert utils.generate_with_anthropic("prompt") == "ok"
+    assert len(calls) == 4
+    assert clock.sleeps == [1, 2, 4]
+    output = capsys.readouterr().out
+    assert [line for line in output.splitlines() if line.startswith("Rate limit exceeded")] == [
+        f"Rate limit exceeded. Waiting {wait} seconds before retrying..." for wait in (1, 2, 4)
+    ]
+
+
+def _write_cache_entries(cache_dir, worker, count):
+    os.environ[utils.LLM_CACHE_DIR_ENV] = cache_dir
+    cache = utils.get_llm_cache()
+    for index in range(count):
+        cache.set(f"{worker}-{index}", f"response {worker}-{index}")
+
+
+def test_llm_cache_is_shared_by_concurrent_processes(tmp_path):
+    import multiprocessing
+
+    context = multiprocessing.get_context("spawn")
+    processes = [context.Process(target=_write_cache_entries, args=(str(tmp_path), worker, 50)) for worker in range(4)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+    assert [process.exitcode for process in processes] == [0] * 4
+    cache = utils.LLMResponseCache(str(tmp_path / utils.LLM_CACHE_FILE_NAME))
+    assert all(cache.get(f"{worker}-{index}") == f"response {worker}-{index}"
+               for worker in range(4) for index in range(50))
+
+
+def _process_is_running(pid):
+    """True if pid exists and is not a zombie (a killed child may linger until its parent reaps it)."""
+    try:
+        with open(f"/proc/{pid}/stat") as stat_file:
+            return stat_file.read().rsplit(")", 1)[1].split()[0] != "Z"
+    except FileNotFoundError:
+        return False
+
+
+def _process_stops(pid, timeout=5.0):
+    """True if pid stops running within timeout (SIGKILL reaches processes we cannot wait for asynchronously)."""
+    deadline = time.monotonic() + timeout
+    while _process_is_running(pid):
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(0.05)
+    return True
+
+
+@pytest.mark.skipif(not os.path.isdir("/proc"), reason="requires /proc to inspect child processes")
+def test_run_wokwi_tests_kills_processes_on_error(monkeypatch, tmp_path):
+    # wokwi-cli 대신, 하위 프로세스를 하나 더 띄워 그 pid를 기록한 뒤 대기하는 명령을 실행
+    child_pid_file = tmp_path / "child.pid"
+    spawn_child = (
+        "import subprocess, sys, time;"
+        "child = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(60)']);"
+        f"open({str(child_pid_file)!r}, 'w').write(str(child.pid));"
+        "time.sleep(60)"
+    )
+    monkeypatch.setattr(utils, "get_wokwi_cli_command", lambda wokwi_dir: [sys.executable, "-c", spawn_child])
+    monkeypatch.setattr(utils.os.path, "isdir", lambda path: True)
+    processes = []
+
+    def failing_wait(process, timeout=None):
+        if processes:
+            return original_wait(process, timeout)
+        processes.append(process)
+        for _ in range(100):
+            if child_pid_file.exists() and child_pid_file.read_text():
+                break
+            time.sleep(0.05)
+        raise RuntimeError("simulated failure while waiting for wokwi-cli")
+
+    original_wait = utils.subprocess.Popen.wait
+    monkeypatch.setattr(utils.subprocess.Popen, "wait", failing_wait)
+
+    success, _, stderr = utils.run_wokwi_tests(str(tmp_path))
+
+    assert not success
+    assert "simulated failure" in stderr
+    assert not _process_is_running(processes[0].pid)
+    assert _process_stops(int(child_pid_file.read_text()))